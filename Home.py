@@ -2,7 +2,7 @@
 
 import streamlit as st
 import pandas as pd
-from utils import load_data, check_auth, logout, get_current_user, init_session_state
+from utils import get_dataset, get_team_game, check_auth, logout, get_current_user, init_session_state
 
 # ---------------------------------------------------
 # Config & Session
@@ -56,7 +56,9 @@ st.markdown("""
 
 init_session_state()
 
-partidos, partidos_futuros, boxscores, equipos, jugadores = load_data()
+# Solo las tablas que usa esta página (boxscores no se descarga acá)
+datos = get_dataset()
+partidos, equipos, jugadores = datos.partidos, datos.equipos, datos.jugadores
 
 ss = st.session_state
 ss.setdefault("jugador_sel", "")
@@ -206,73 +208,35 @@ st.header("Tabla de Posiciones")
 # STANDINGS (estilo 5_Equipos.py, lado a lado)
 # ---------------------------------------------------
 
-def _col(df, *names):
-    for n in names:
-        if n in df.columns:
-            return n
-    return None
-
-
-def build_standings(df_games: pd.DataFrame, equipos_df: pd.DataFrame) -> dict:
-    if df_games is None or df_games.empty:
-        return {"East": pd.DataFrame(), "West": pd.DataFrame()}
-
-    df = df_games.copy()
-    c_fecha = _col(df, "FECHA", "fecha", "DATE", "date")
-    c_loc = _col(df, "LOCAL", "home", "HOME")
-    c_vis = _col(df, "VISITANTE", "away", "AWAY")
-    c_pl = _col(df, "PTS_LOCAL", "pts_local", "HOME_PTS")
-    c_pv = _col(df, "PTS_VISITANTE", "pts_visitante", "AWAY_PTS")
-    if not all([c_fecha, c_loc, c_vis, c_pl, c_pv]):
+def build_standings(team_game: pd.DataFrame, equipos_df: pd.DataFrame) -> dict:
+    # Solo partidos jugados (con rival en partidos)
+    jugados = team_game[team_game["OPP"].notna()] if team_game is not None else None
+    if jugados is None or jugados.empty:
         return {"East": pd.DataFrame(), "West": pd.DataFrame()}
 
-    df[c_fecha] = pd.to_datetime(df[c_fecha], errors="coerce")
-    df = df.sort_values(c_fecha)
-
-    home = df.assign(
-        ABBR=df[c_loc],
-        PTS_FOR=df[c_pl],
-        PTS_AGAINST=df[c_pv],
-        WIN=(df[c_pl] > df[c_pv]).astype(int),
-        LOSS=(df[c_pl] < df[c_pv]).astype(int),
-    )[["ABBR", "PTS_FOR", "PTS_AGAINST", "WIN", "LOSS", c_fecha]]
-
-    away = df.assign(
-        ABBR=df[c_vis],
-        PTS_FOR=df[c_pv],
-        PTS_AGAINST=df[c_pl],
-        WIN=(df[c_pv] > df[c_pl]).astype(int),
-        LOSS=(df[c_pv] < df[c_pl]).astype(int),
-    )[["ABBR", "PTS_FOR", "PTS_AGAINST", "WIN", "LOSS", c_fecha]]
-
-    all_rows = pd.concat([home, away], ignore_index=True)
-
     tabla = (
-        all_rows.groupby("ABBR", as_index=False)
+        jugados.groupby("TEAM_ABBREVIATION", as_index=False, observed=True)
         .agg(
-            PJ=(c_fecha, "count"),
+            PJ=("FECHA", "count"),
             PG=("WIN", "sum"),
             PP=("LOSS", "sum"),
             PTS_FOR=("PTS_FOR", "sum"),
             PTS_AGAINST=("PTS_AGAINST", "sum"),
         )
+        .rename(columns={"TEAM_ABBREVIATION": "ABBR"})
     )
     tabla["DIF"] = tabla["PTS_FOR"] - tabla["PTS_AGAINST"]
 
-    # Últimos 5 resultados (W/L)
-    last_all = {t: [] for t in tabla["ABBR"]}
-    for _, r in df.iterrows():
-        h, a = r[c_loc], r[c_vis]
-        pl, pv = int(r[c_pl]), int(r[c_pv])
-        last_all[h].append("W" if pl > pv else "L")
-        last_all[a].append("W" if pv > pl else "L")
+    # Últimos 5 resultados (W/L); team_game ya viene ordenada por fecha
+    resultados = jugados["WIN"].map({1: "W", 0: "L"})
+    last_all = resultados.groupby(jugados["TEAM_ABBREVIATION"], observed=True).agg(list)
 
     def take_last5(seq):
         tail = seq[-5:] if len(seq) >= 5 else seq
         tail = ([""] * (5 - len(tail))) + tail
         return tail
 
-    tabla["last5"] = tabla["ABBR"].map(lambda t: take_last5(last_all.get(t, [])))
+    tabla["last5"] = [take_last5(last_all.get(t, [])) for t in tabla["ABBR"]]
 
     # Nombre + logo
     if {"TEAM_NAME", "LOGO_URL"}.issubset(equipos_df.columns):
@@ -422,7 +386,7 @@ def render_standings_side_by_side(tablas: dict):
 if partidos is None or partidos.empty or equipos is None or equipos.empty:
     st.info("No hay datos suficientes para mostrar las clasificaciones.")
 else:
-    standings = build_standings(partidos, equipos)
+    standings = build_standings(get_team_game(estadisticas=False), equipos)
     render_standings_side_by_side(standings)
 
 st.markdown("---")
@@ -0,0 +1,61 @@
+import pandas as pd
+
+
+# ==============================================================
+# 🕐 FUNCIONES DE FORMATO DE MINUTOS
+# ==============================================================
+# Funciones puras: se pueden importar sin Streamlit ni Supabase
+# (ETL, scripts, pruebas). utils las reexporta para las páginas.
+
+def minutos_decimal_a_mmss(minutos_decimal: float) -> str:
+	"""
+	Convierte minutos decimales (ej: 25.5) a formato mm:ss (ej: "25:30").
+
+	Args:
+		minutos_decimal: Minutos en formato decimal
+
+	Returns:
+		str: Formato mm:ss
+	"""
+	if minutos_decimal is None or pd.isna(minutos_decimal):
+		return "0:00"
+
+	try:
+		minutos_decimal = float(minutos_decimal)
+		minutos = int(minutos_decimal)
+		segundos = int((minutos_decimal - minutos) * 60)
+		return f"{minutos}:{segundos:02d}"
+	except (ValueError, TypeError):
+		return "0:00"
+
+
+def mmss_a_minutos_decimal(mmss: str) -> float:
+	"""
+	Convierte formato mm:ss (ej: "25:30") a minutos decimales (ej: 25.5).
+
+	Args:
+		mmss: String en formato mm:ss o mm:ss
+
+	Returns:
+		float: Minutos en formato decimal
+	"""
+	if not mmss or mmss == "":
+		return 0.0
+
+	# Si ya es un número, retornarlo
+	try:
+		return float(mmss)
+	except (ValueError, TypeError):
+		pass
+
+	# Intentar parsear formato mm:ss
+	try:
+		if ":" in str(mmss):
+			parts = str(mmss).split(":")
+			minutos = int(parts[0])
+			segundos = int(parts[1]) if len(parts) > 1 else 0
+			return minutos + segundos / 60.0
+	except (ValueError, TypeError, IndexError):
+		pass
+
+	return 0.0
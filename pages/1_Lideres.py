@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import load_data, check_auth, init_session_state
+from utils import load_table, check_auth, init_session_state
 
 st.set_page_config(
     page_title="Líderes | NBA Stats App",
@@ -9,7 +9,10 @@ st.set_page_config(
 
 # Inicializar estado de sesión
 init_session_state()
-_, _, boxscores, _, _ = load_data()
+boxscores = load_table("boxscores", [
+    "GAME_ID", "PLAYER_NAME", "TEAM_ABBREVIATION",
+    "PTS", "AST", "REB", "STL", "BLK", "FTM", "FTA",
+])
 
 # ENCABEZADO CON ESTILO
 st.markdown("""
@@ -34,14 +37,14 @@ elif faltan_requisitos:
     st.info("⚠️ No se encontraron columnas necesarias en los datos.")
 else:
     # Calcular partidos jugados por equipo
-    juegos_por_equipo = boxscores.groupby("TEAM_ABBREVIATION")["GAME_ID"].nunique()
+    juegos_por_equipo = boxscores.groupby("TEAM_ABBREVIATION", observed=True)["GAME_ID"].nunique()
     partidos_maximos = juegos_por_equipo.max()
 
     # Calcular partidos jugados por jugador (por equipo), quedarnos con el equipo más jugado
     juegos_jugador_equipo = (
-        boxscores.groupby(["PLAYER_NAME", "TEAM_ABBREVIATION"])["GAME_ID"].nunique().reset_index()
+        boxscores.groupby(["PLAYER_NAME", "TEAM_ABBREVIATION"], observed=True)["GAME_ID"].nunique().reset_index()
     )
-    idx_max_games = juegos_jugador_equipo.groupby("PLAYER_NAME")["GAME_ID"].idxmax()
+    idx_max_games = juegos_jugador_equipo.groupby("PLAYER_NAME", observed=True)["GAME_ID"].idxmax()
     juegos_jugador = juegos_jugador_equipo.loc[idx_max_games][["PLAYER_NAME", "TEAM_ABBREVIATION", "GAME_ID"]]
     juegos_dict = juegos_jugador.set_index("PLAYER_NAME")["GAME_ID"].to_dict()
 
@@ -52,7 +55,7 @@ else:
 
     # Calcular promedios por partido
     promedios = (
-        boxscores_filtrado.groupby("PLAYER_NAME")[list(metricas_cols.values())]
+        boxscores_filtrado.groupby("PLAYER_NAME", observed=True)[list(metricas_cols.values())]
         .mean()
         .reset_index()
     )
@@ -117,7 +120,7 @@ else:
     # Robos por partido
     if "STL" in boxscores.columns:
         promedios_stl = (
-            boxscores_filtrado.groupby("PLAYER_NAME")["STL"].mean().reset_index()
+            boxscores_filtrado.groupby("PLAYER_NAME", observed=True)["STL"].mean().reset_index()
         )
         promedios_stl["Equipo"] = promedios_stl["PLAYER_NAME"].map(equipos_jugador)
         top_stl = promedios_stl.sort_values(by="STL", ascending=False).head(10)[["PLAYER_NAME", "Equipo", "STL"]].reset_index(drop=True)
@@ -128,7 +131,7 @@ else:
     # Bloqueos por partido
     if "BLK" in boxscores.columns:
         promedios_blk = (
-            boxscores_filtrado.groupby("PLAYER_NAME")["BLK"].mean().reset_index()
+            boxscores_filtrado.groupby("PLAYER_NAME", observed=True)["BLK"].mean().reset_index()
         )
         promedios_blk["Equipo"] = promedios_blk["PLAYER_NAME"].map(equipos_jugador)
         top_blk = promedios_blk.sort_values(by="BLK", ascending=False).head(10)[["PLAYER_NAME", "Equipo", "BLK"]].reset_index(drop=True)
@@ -139,7 +142,7 @@ else:
     # Porcentaje de tiros libres
     if "FTM" in boxscores.columns and "FTA" in boxscores.columns:
         tiros_libres_agg = (
-            boxscores_filtrado.groupby("PLAYER_NAME")[["FTM", "FTA"]].sum().reset_index()
+            boxscores_filtrado.groupby("PLAYER_NAME", observed=True)[["FTM", "FTA"]].sum().reset_index()
         )
         tiros_libres_agg["Equipo"] = tiros_libres_agg["PLAYER_NAME"].map(equipos_jugador)
         # Filtrar solo jugadores con al menos los mínimos de la imagen
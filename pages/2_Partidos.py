@@ -6,14 +6,16 @@ import calendar
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from utils import load_data, check_auth, init_session_state, minutos_decimal_a_mmss
+from utils import get_dataset, check_auth, init_session_state, minutos_decimal_a_mmss, buscar_partido, buscar_boxscores_partido
 
 st.set_page_config(page_title="Partidos | NBA Stats App", layout="wide")
 
 # Inicializar estado de sesión
 init_session_state()
 
-partidos, _, boxscores, equipos, _ = load_data()
+# boxscores se carga recién al abrir un partido (buscar_boxscores_partido)
+datos = get_dataset()
+partidos, equipos = datos.partidos, datos.equipos
 ss = st.session_state
 ss.setdefault("game_sel", "")
 ss.setdefault("selected_date", None)
@@ -64,7 +66,6 @@ def preparar_partidos(df_raw: pd.DataFrame) -> pd.DataFrame:
     df = df[[c_game, c_fecha, c_loc, c_vis, c_pl, c_pv]].copy()
     df.columns = ["GAME_ID", "FECHA", "LOCAL", "VISITANTE", "PTS_LOCAL", "PTS_VISITANTE"]
 
-    df["FECHA"] = pd.to_datetime(df["FECHA"], errors="coerce")
     df = df[df["FECHA"].notna()].copy()
     df["FECHA_DATE"] = df["FECHA"].dt.date
 
@@ -90,7 +91,6 @@ def _build_standings_upto(df_games: pd.DataFrame, equipos_df: pd.DataFrame, fech
     if not all([c_fecha, c_loc, c_vis, c_pl, c_pv, c_gameid]):
         return pd.DataFrame()
 
-    df[c_fecha] = pd.to_datetime(df[c_fecha], errors="coerce")
     if fecha_corte is not None:
         # quedate SOLO con partidos anteriores al partido seleccionado
         df = df[df[c_fecha] < fecha_corte]
@@ -112,7 +112,7 @@ def _build_standings_upto(df_games: pd.DataFrame, equipos_df: pd.DataFrame, fech
     all_rows = pd.concat([home, away], ignore_index=True)
 
     tabla = (
-        all_rows.groupby("ABBR", as_index=False)
+        all_rows.groupby("ABBR", as_index=False, observed=True)
         .agg(PJ=(c_fecha, "count"),
              PG=("WIN", "sum"),
              PP=("LOSS", "sum"),
@@ -134,7 +134,7 @@ def _build_standings_upto(df_games: pd.DataFrame, equipos_df: pd.DataFrame, fech
         tail = ([""] * (5 - len(tail))) + tail
         return tail
 
-    tabla["last5"] = tabla["ABBR"].map(lambda t: take_last5(last_all.get(t, [])))
+    tabla["last5"] = [take_last5(last_all.get(t, [])) for t in tabla["ABBR"]]
 
     if equipos_df is not None and not equipos_df.empty and "TEAM_NAME" in equipos_df.columns:
         tabla = tabla.merge(
@@ -213,12 +213,7 @@ def _render_prematch_card(tabla: pd.DataFrame, t_local: str, t_visit: str):
 
 # ---------- render boxscore ----------
 def render_boxscore_inline(game_id: str, partidos_df: pd.DataFrame):
-    if boxscores is None or boxscores.empty:
-        st.warning("No hay boxscores disponibles.")
-        return
-
-    p = partidos_df
-    row = p[p["GAME_ID"].astype(str) == str(game_id)].head(1)
+    row = buscar_partido(game_id).head(1)
 
     header_txt = f"Partido {game_id}"
     team_local = ""
@@ -236,7 +231,7 @@ def render_boxscore_inline(game_id: str, partidos_df: pd.DataFrame):
     st.markdown("---")
     st.markdown(f"### 📊 {header_txt}")
 
-    df_game = boxscores[boxscores["GAME_ID"].astype(str) == str(game_id)].copy()
+    df_game = buscar_boxscores_partido(game_id)
     if df_game.empty:
         st.info("No se encontraron estadísticas para este partido.")
         if st.button("⬅ Volver al calendario"):
@@ -320,7 +315,6 @@ def render_calendar(partidos_df: pd.DataFrame):
         if "FECHA" not in df.columns:
             st.warning("No se encuentra la columna 'FECHA' en los datos.")
             return
-        df["FECHA"] = pd.to_datetime(df["FECHA"], errors="coerce")
         df = df[df["FECHA"].notna()].copy()
         df["FECHA_DATE"] = df["FECHA"].dt.date
 
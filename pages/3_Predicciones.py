@@ -2,131 +2,38 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from scipy.stats import norm
-from utils import load_data, check_auth, init_session_state, minutos_decimal_a_mmss
+from utils import get_dataset, armar_team_game, calculo_derivado, check_auth, init_session_state, minutos_decimal_a_mmss
+from predicciones import precalcular_todos_promedios, calcular_record_actual
 
 st.set_page_config(page_title="Predicciones | NBA Stats App", layout="wide")
 
 # Inicializar estado de sesión
 init_session_state()
 
-partidos, partidos_futuros, boxscores, equipos, jugadores = load_data()
+datos = get_dataset()
+partidos_futuros, boxscores, jugadores = (
+    datos.partidos_futuros, datos.boxscores, datos.jugadores
+)
 
 # ==============================================================
 # FUNCIONES DE CÁLCULO
 # ==============================================================
 
-def precalcular_todos_promedios(
-    partidos_df: pd.DataFrame,
-    boxscores_df: pd.DataFrame
-) -> tuple[dict, dict, dict]:
+def calcular_promedios_equipo(team_game_df: pd.DataFrame, team_abbr: str) -> dict:
     """
-    Precalcula todos los promedios ofensivos, defensivos y desvíos de todos los equipos.
-    Retorna (promedios_ofensivos, promedios_defensivos, desvios_puntos)
-    donde cada uno es un diccionario {team_abbr: valores}
+    Calcula los promedios ofensivos de un equipo desde la tabla equipo-partido
+    (get_team_game). Retorna un diccionario con promedios por partido.
     """
-    promedios_of = {}
-    promedios_def = {}
-    desvios = {}
-    
-    if boxscores_df.empty:
-        return promedios_of, promedios_def, desvios
-    
-    # Obtener todos los equipos únicos
-    equipos_unicos = boxscores_df["TEAM_ABBREVIATION"].dropna().unique()
-    
-    # Precalcular estadísticas por partido para todos los equipos
-    stats_cols = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
-    available_cols = [col for col in stats_cols if col in boxscores_df.columns]
-    
-    # Agrupar por equipo y partido para calcular promedios ofensivos y desvíos
-    for team in equipos_unicos:
-        team_str = str(team)
-        team_boxscores = boxscores_df[boxscores_df["TEAM_ABBREVIATION"] == team_str].copy()
-        
-        if team_boxscores.empty:
-            continue
-        
-        # Calcular promedios ofensivos
-        team_stats_per_game = team_boxscores.groupby("GAME_ID")[available_cols].sum().reset_index()
-        promedios_of[team_str] = {}
-        for col in available_cols:
-            promedios_of[team_str][col] = team_stats_per_game[col].mean()
-        
-        # Calcular desvío de puntos
-        if "PTS" in team_stats_per_game.columns:
-            puntos_por_partido = team_stats_per_game["PTS"]
-            if len(puntos_por_partido) >= 2:
-                desvio = puntos_por_partido.std()
-                desvios[team_str] = float(desvio) if not pd.isna(desvio) else 0.0
-            else:
-                desvios[team_str] = 0.0
-        else:
-            desvios[team_str] = 0.0
-    
-    # Precalcular promedios defensivos
-    if not partidos_df.empty:
-        # Crear un diccionario de estadísticas por partido para acceso rápido
-        stats_por_partido = {}
-        for game_id in boxscores_df["GAME_ID"].unique():
-            game_id_str = str(game_id)
-            game_boxscores = boxscores_df[boxscores_df["GAME_ID"].astype(str) == game_id_str]
-            stats_por_partido[game_id_str] = {}
-            for team in game_boxscores["TEAM_ABBREVIATION"].unique():
-                team_str = str(team)
-                team_game_stats = game_boxscores[game_boxscores["TEAM_ABBREVIATION"] == team_str]
-                stats_por_partido[game_id_str][team_str] = team_game_stats[available_cols].sum().to_dict()
-        
-        # Para cada equipo, calcular promedios defensivos
-        for team in equipos_unicos:
-            team_str = str(team)
-            partidos_equipo = partidos_df[
-                (partidos_df["LOCAL"] == team_str) | (partidos_df["VISITANTE"] == team_str)
-            ].copy()
-            
-            if partidos_equipo.empty:
-                promedios_def[team_str] = {}
-                continue
-            
-            rival_stats = []
-            for _, partido in partidos_equipo.iterrows():
-                game_id_str = str(partido["GAME_ID"])
-                local = str(partido["LOCAL"])
-                visitante = str(partido["VISITANTE"])
-                
-                # Determinar el rival
-                rival = visitante if local == team_str else local
-                
-                # Obtener estadísticas del rival desde el diccionario precalculado
-                if game_id_str in stats_por_partido and rival in stats_por_partido[game_id_str]:
-                    rival_stats.append(stats_por_partido[game_id_str][rival])
-            
-            if rival_stats:
-                df_rival_stats = pd.DataFrame(rival_stats)
-                promedios_def[team_str] = {}
-                for col in available_cols:
-                    promedios_def[team_str][col] = df_rival_stats[col].mean()
-            else:
-                promedios_def[team_str] = {}
-    
-    return promedios_of, promedios_def, desvios
-
-
-def calcular_promedios_equipo(boxscores_df: pd.DataFrame, team_abbr: str) -> dict:
-    """
-    Calcula los promedios ofensivos y defensivos de un equipo desde los boxscores.
-    Retorna un diccionario con promedios por partido.
-    """
-    if boxscores_df.empty or team_abbr not in boxscores_df["TEAM_ABBREVIATION"].values:
+    if team_game_df.empty or team_abbr not in team_game_df["TEAM_ABBREVIATION"].values:
         return {}
     
-    # Filtrar boxscores del equipo
-    team_boxscores = boxscores_df[boxscores_df["TEAM_ABBREVIATION"] == team_abbr].copy()
-    
-    # Agrupar por partido y sumar estadísticas del equipo
+    # Partidos del equipo con boxscores cargados
     stats_cols = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
-    available_cols = [col for col in stats_cols if col in team_boxscores.columns]
+    available_cols = [col for col in stats_cols if col in team_game_df.columns]
     
-    team_stats_per_game = team_boxscores.groupby("GAME_ID")[available_cols].sum().reset_index()
+    team_stats_per_game = team_game_df[
+        (team_game_df["TEAM_ABBREVIATION"] == team_abbr) & team_game_df["PTS"].notna()
+    ]
     
     # Calcular promedios
     promedios = {}
@@ -136,21 +43,17 @@ def calcular_promedios_equipo(boxscores_df: pd.DataFrame, team_abbr: str) -> dic
     return promedios
 
 
-def calcular_desvio_puntos(boxscores_df: pd.DataFrame, team_abbr: str) -> float:
+def calcular_desvio_puntos(team_game_df: pd.DataFrame, team_abbr: str) -> float:
     """
     Calcula el desvío estándar de los puntajes históricos de un equipo.
     """
-    if boxscores_df.empty or team_abbr not in boxscores_df["TEAM_ABBREVIATION"].values:
+    if team_game_df.empty or "PTS" not in team_game_df.columns:
         return 0.0
     
-    # Filtrar boxscores del equipo
-    team_boxscores = boxscores_df[boxscores_df["TEAM_ABBREVIATION"] == team_abbr].copy()
-    
-    if team_boxscores.empty or "PTS" not in team_boxscores.columns:
-        return 0.0
-    
-    # Agrupar por partido y sumar puntos del equipo
-    puntos_por_partido = team_boxscores.groupby("GAME_ID")["PTS"].sum()
+    # Puntos del equipo en cada partido con boxscores cargados
+    puntos_por_partido = team_game_df.loc[
+        team_game_df["TEAM_ABBREVIATION"] == team_abbr, "PTS"
+    ].dropna()
     
     if len(puntos_por_partido) < 2:
         return 0.0
@@ -206,53 +109,29 @@ def calcular_probabilidad_victoria(
     return float(prob_local), float(prob_visit)
 
 
-def calcular_promedios_defensivos(partidos_df: pd.DataFrame, boxscores_df: pd.DataFrame, team_abbr: str) -> dict:
+def calcular_promedios_defensivos(team_game_df: pd.DataFrame, team_abbr: str) -> dict:
     """
-    Calcula los promedios defensivos de un equipo (puntos y estadísticas que recibe).
+    Calcula los promedios defensivos de un equipo (puntos y estadísticas que recibe)
+    desde la tabla equipo-partido (get_team_game).
     """
-    if partidos_df.empty or boxscores_df.empty:
-        return {}
-    
-    # Obtener todos los partidos donde participó el equipo
-    partidos_equipo = partidos_df[
-        (partidos_df["LOCAL"] == team_abbr) | (partidos_df["VISITANTE"] == team_abbr)
-    ].copy()
-    
-    if partidos_equipo.empty:
+    if team_game_df.empty or "OPP_PTS" not in team_game_df.columns:
         return {}
     
-    # Para cada partido, obtener las estadísticas del rival
+    # Partidos del equipo en los que hay boxscores del rival
     stats_cols = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
-    available_cols = [col for col in stats_cols if col in boxscores_df.columns]
-    
-    rival_stats = []
+    available_cols = [col for col in stats_cols if f"OPP_{col}" in team_game_df.columns]
     
-    for _, partido in partidos_equipo.iterrows():
-        game_id = str(partido["GAME_ID"])
-        local = str(partido["LOCAL"])
-        visitante = str(partido["VISITANTE"])
-        
-        # Determinar el rival
-        rival = visitante if local == team_abbr else local
-        
-        # Obtener estadísticas del rival en ese partido
-        rival_box = boxscores_df[
-            (boxscores_df["GAME_ID"].astype(str) == game_id) &
-            (boxscores_df["TEAM_ABBREVIATION"] == rival)
-        ]
-        
-        if not rival_box.empty:
-            rival_game_stats = rival_box[available_cols].sum().to_dict()
-            rival_stats.append(rival_game_stats)
+    rival_stats = team_game_df[
+        (team_game_df["TEAM_ABBREVIATION"] == team_abbr) & team_game_df["OPP_PTS"].notna()
+    ]
     
-    if not rival_stats:
+    if rival_stats.empty:
         return {}
     
     # Calcular promedios defensivos
-    df_rival_stats = pd.DataFrame(rival_stats)
     promedios_def = {}
     for col in available_cols:
-        promedios_def[col] = df_rival_stats[col].mean()
+        promedios_def[col] = rival_stats[f"OPP_{col}"].mean()
     
     return promedios_def
 
@@ -372,7 +251,7 @@ def obtener_jugadores_equipo_min_10min(boxscores_df: pd.DataFrame, jugadores_df:
     if "MIN" in team_boxscores.columns:
         team_boxscores["MIN"] = pd.to_numeric(team_boxscores["MIN"], errors="coerce")
     
-    promedios_jugadores = team_boxscores.groupby("PLAYER_NAME")[available_cols].mean().reset_index()
+    promedios_jugadores = team_boxscores.groupby("PLAYER_NAME", observed=True)[available_cols].mean().reset_index()
     
     # Filtrar jugadores con mínimo 10 minutos promedio
     if "MIN" in promedios_jugadores.columns:
@@ -383,7 +262,7 @@ def obtener_jugadores_equipo_min_10min(boxscores_df: pd.DataFrame, jugadores_df:
     
     # Agregar información del jugador si está disponible
     if "PLAYER_ID" not in promedios_jugadores.columns and "PLAYER_ID" in team_boxscores.columns:
-        player_ids = team_boxscores.groupby("PLAYER_NAME")["PLAYER_ID"].first().reset_index()
+        player_ids = team_boxscores.groupby("PLAYER_NAME", observed=True)["PLAYER_ID"].first().reset_index()
         promedios_jugadores = promedios_jugadores.merge(player_ids, on="PLAYER_NAME", how="left")
     
     return promedios_jugadores
@@ -682,58 +561,8 @@ def predecir_puntos_rapido(
     return float(pts_local), float(pts_visit)
 
 
-def calcular_record_actual(partidos_df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Calcula el record actual de cada equipo (PJ, PG, PP).
-    """
-    if partidos_df.empty:
-        return pd.DataFrame()
-    
-    # Verificar columnas necesarias
-    c_loc = None
-    c_vis = None
-    c_pl = None
-    c_pv = None
-    
-    for col in partidos_df.columns:
-        if col.upper() in ["LOCAL", "HOME"]:
-            c_loc = col
-        elif col.upper() in ["VISITANTE", "AWAY", "VISITOR"]:
-            c_vis = col
-        elif col.upper() in ["PTS_LOCAL", "HOME_PTS"]:
-            c_pl = col
-        elif col.upper() in ["PTS_VISITANTE", "AWAY_PTS", "VISITOR_PTS"]:
-            c_pv = col
-    
-    if not all([c_loc, c_vis, c_pl, c_pv]):
-        return pd.DataFrame()
-    
-    # Crear filas para local y visitante
-    home = partidos_df.assign(
-        TEAM=partidos_df[c_loc],
-        WIN=(partidos_df[c_pl] > partidos_df[c_pv]).astype(int),
-        LOSS=(partidos_df[c_pl] < partidos_df[c_pv]).astype(int)
-    )[["TEAM", "WIN", "LOSS"]]
-    
-    away = partidos_df.assign(
-        TEAM=partidos_df[c_vis],
-        WIN=(partidos_df[c_pv] > partidos_df[c_pl]).astype(int),
-        LOSS=(partidos_df[c_pv] < partidos_df[c_pl]).astype(int)
-    )[["TEAM", "WIN", "LOSS"]]
-    
-    # Combinar y agregar
-    all_games = pd.concat([home, away], ignore_index=True)
-    record = all_games.groupby("TEAM", as_index=False).agg(
-        PJ=("WIN", "count"),
-        PG=("WIN", "sum"),
-        PP=("LOSS", "sum")
-    )
-    
-    return record
-
-
 def predecir_temporada_completa(
-    partidos_df: pd.DataFrame,
+    team_game_df: pd.DataFrame,
     partidos_futuros_df: pd.DataFrame,
     promedios_of: dict,
     promedios_def: dict,
@@ -748,7 +577,7 @@ def predecir_temporada_completa(
         return pd.DataFrame()
     
     # Calcular record actual
-    record_actual = calcular_record_actual(partidos_df)
+    record_actual = calcular_record_actual(team_game_df)
     
     # Inicializar record predicho con el actual
     if not record_actual.empty:
@@ -907,17 +736,56 @@ def construir_tabla_posiciones_final(
     return {"East": east, "West": west}
 
 
+# ==============================================================
+# CACHE DEL MODELO (POR VERSIÓN DE LOS DATOS)
+# ==============================================================
+# Compartido entre sesiones; las escrituras del admin lo invalidan.
+# Cada cálculo usa solo los DataFrames que recibe, así el resultado
+# corresponde a la versión con la que calculo_derivado lo guarda.
+
+def _calcular_modelo(partidos_df: pd.DataFrame, boxscores_df: pd.DataFrame) -> tuple[dict, dict, dict]:
+    return precalcular_todos_promedios(armar_team_game(partidos_df, boxscores_df))
+
+
+def modelo_equipos() -> tuple[dict, dict, dict]:
+    """
+    Promedios ofensivos, defensivos y desvíos de todos los equipos
+    (ver precalcular_todos_promedios), calculados una vez por versión.
+    """
+    return calculo_derivado("predicciones_promedios", ("partidos", "boxscores"), _calcular_modelo)
+
+
+def _calcular_temporada(
+    partidos_df: pd.DataFrame,
+    partidos_futuros_df: pd.DataFrame,
+    boxscores_df: pd.DataFrame
+) -> pd.DataFrame:
+    # El modelo se arma con estos mismos DataFrames (no con modelo_equipos(),
+    # que podría ser de otra versión): el vectorizado cuesta poco
+    team_game_df = armar_team_game(partidos_df, boxscores_df)
+    promedios_of, promedios_def, desvios = precalcular_todos_promedios(team_game_df)
+    return predecir_temporada_completa(
+        team_game_df, partidos_futuros_df, promedios_of, promedios_def, desvios
+    )
+
+
+def prediccion_temporada() -> pd.DataFrame:
+    """Record predicho de la temporada completa, calculado una vez por versión."""
+    return calculo_derivado(
+        "predicciones_temporada", ("partidos", "partidos_futuros", "boxscores"), _calcular_temporada
+    )
+
+
 # ==============================================================
 # UI
 # ==============================================================
 
 st.title("🔮 Predicciones")
 
-# Precalcular todos los promedios una sola vez
+# Precalcular todos los promedios una sola vez por versión de los datos
+# (compartido entre sesiones; las escrituras del admin lo invalidan)
 with st.spinner("Precalculando estadísticas de equipos..."):
-    promedios_ofensivos, promedios_defensivos, desvios_puntos = precalcular_todos_promedios(
-        partidos, boxscores
-    )
+    promedios_ofensivos, promedios_defensivos, desvios_puntos = modelo_equipos()
 
 if partidos_futuros.empty:
     st.info("No hay partidos futuros disponibles para predecir.")
@@ -933,7 +801,6 @@ with tab1:
     # Preparar opciones de partidos futuros
     partidos_futuros_display = partidos_futuros.copy()
     if "FECHA" in partidos_futuros_display.columns:
-        partidos_futuros_display["FECHA"] = pd.to_datetime(partidos_futuros_display["FECHA"], errors="coerce")
         partidos_futuros_display = partidos_futuros_display.sort_values("FECHA")
 
     # Crear string de display para cada partido
@@ -941,7 +808,7 @@ with tab1:
         fecha_str = ""
         if "FECHA" in row and pd.notna(row["FECHA"]):
             try:
-                fecha_str = pd.to_datetime(row["FECHA"]).strftime("%d/%m/%Y")
+                fecha_str = row["FECHA"].strftime("%d/%m/%Y")
             except:
                 fecha_str = str(row["FECHA"])
         
@@ -979,7 +846,7 @@ with tab1:
 
         if pd.notna(fecha):
             try:
-                fecha_str = pd.to_datetime(fecha).strftime("%d de %B de %Y")
+                fecha_str = fecha.strftime("%d de %B de %Y")
                 st.caption(f"Fecha programada: {fecha_str}")
             except:
                 st.caption(f"Fecha programada: {fecha}")
@@ -1008,6 +875,7 @@ with tab1:
                     # Obtener logos de los equipos
                     logo_local = None
                     logo_visit = None
+                    equipos = datos.equipos  # se carga recién acá
                     if not equipos.empty and "LOGO_URL" in equipos.columns:
                         logo_local_row = equipos[equipos["TEAM_ABBREVIATION"] == team_local]
                         logo_visit_row = equipos[equipos["TEAM_ABBREVIATION"] == team_visit]
@@ -1154,15 +1022,13 @@ with tab2:
     with st.spinner("Calculando predicciones de temporada completa..."):
         try:
             # Calcular predicciones de temporada usando datos precalculados
-            record_predicho = predecir_temporada_completa(
-                partidos, partidos_futuros, promedios_ofensivos, promedios_defensivos, desvios_puntos
-            )
+            record_predicho = prediccion_temporada()
             
             if record_predicho.empty:
                 st.warning("No se pudieron calcular las predicciones de temporada.")
             else:
                 # Construir tabla de posiciones final dividida por conferencia
-                tablas_final = construir_tabla_posiciones_final(record_predicho, equipos)
+                tablas_final = construir_tabla_posiciones_final(record_predicho, datos.equipos)
                 
                 if not tablas_final["East"].empty or not tablas_final["West"].empty:
                     st.markdown("### Tabla de Posiciones Final (Predicha)")
@@ -3,7 +3,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from utils import load_data, check_auth, init_session_state, minutos_decimal_a_mmss
+from utils import get_dataset, check_auth, init_session_state, minutos_decimal_a_mmss, buscar_jugador
 
 st.set_page_config(page_title="Jugador | NBA Stats App", layout="wide")
 
@@ -11,7 +11,8 @@ st.set_page_config(page_title="Jugador | NBA Stats App", layout="wide")
 init_session_state()
 
 # ================== DATA ==================
-partidos, partidos_futuros, boxscores, equipos, jugadores = load_data()
+datos = get_dataset()
+boxscores, jugadores = datos.boxscores, datos.jugadores
 
 ss = st.session_state
 ss.setdefault("jugador_sel", "")
@@ -92,9 +93,9 @@ def find_profile_by_name(name: str):
     if {"PLAYER_NAME","PLAYER_ID"}.issubset(boxscores.columns):
         bs = boxscores[boxscores["PLAYER_NAME"].str.lower() == name.lower()]
         if not bs.empty:
-            pid = bs["PLAYER_ID"].dropna().astype(str).iloc[-1]
-    if pid is not None and "PLAYER_ID" in jugadores.columns:
-        j = jugadores[jugadores["PLAYER_ID"].astype(str) == str(pid)]
+            pid = bs["PLAYER_ID"].dropna().iloc[-1]
+    if pid is not None:
+        j = buscar_jugador(pid)
         if not j.empty: return j.iloc[0].to_dict()
     if {"FIRST_NAME","LAST_NAME"}.issubset(jugadores.columns):
         j2 = jugadores[jugadores.apply(lambda r: full_name_from_row(r).lower() == name.lower(), axis=1)]
@@ -209,7 +210,7 @@ def build_league_averages(boxscores: pd.DataFrame) -> pd.DataFrame:
     df = df.assign(__FG_PCT__=_fg_pct_from(df))
     metrics = [m for m in ["PTS","REB","AST","STL","BLK","__FG_PCT__"] if (m in df.columns or m=="__FG_PCT__")]
     league = (
-        df.groupby("PLAYER_NAME")[metrics]
+        df.groupby("PLAYER_NAME", observed=True)[metrics]
           .mean(numeric_only=True)
           .rename(columns={"__FG_PCT__": "FG_PCT"})
     )
@@ -1,14 +1,17 @@
 # pages/5_Equipos.py
 import streamlit as st
 import pandas as pd
-from utils import load_data, check_auth, init_session_state
+from utils import get_dataset, get_team_game, check_auth, init_session_state
 
 st.set_page_config(page_title="Equipo | NBA Stats App", layout="wide")
 
 # Inicializar estado de sesión
 init_session_state()
 
-partidos, partidos_futuros, boxscores, equipos, jugadores = load_data()
+datos = get_dataset()
+partidos, partidos_futuros, equipos, jugadores = (
+    datos.partidos, datos.partidos_futuros, datos.equipos, datos.jugadores
+)
 ss = st.session_state
 
 # ------------------ selección de equipo ------------------
@@ -80,7 +83,6 @@ def next_fixture(df_fut: pd.DataFrame, abbr: str):
     mask = (df[c_loc] == abbr) | (df[c_vis] == abbr)
     df = df.loc[mask].copy()
 
-    df[c_fecha] = pd.to_datetime(df[c_fecha], errors="coerce")
     df = df.sort_values(c_fecha)
 
     today = pd.Timestamp("today").normalize()
@@ -111,7 +113,6 @@ def games_for_team(df_games: pd.DataFrame, abbr: str) -> pd.DataFrame:
     df = df.loc[mask, [c_fecha, c_loc, c_vis, c_pl, c_pv]].copy()
     if df.empty: return pd.DataFrame()
 
-    df[c_fecha] = pd.to_datetime(df[c_fecha], errors="coerce")
     df = df.sort_values(c_fecha, ascending=False).reset_index(drop=True)
     df.rename(columns={
         c_fecha: "FECHA", c_loc: "LOCAL", c_vis: "VISITANTE",
@@ -184,61 +185,38 @@ def render_history_cards(df: pd.DataFrame, abbr: str):
                 st.markdown(f"<div style='margin-top:-2px;'>{badge}</div>", unsafe_allow_html=True)
 
 
-def build_standings(df_games: pd.DataFrame, equipos_df: pd.DataFrame) -> dict:
+def build_standings(team_game: pd.DataFrame, equipos_df: pd.DataFrame) -> dict:
     """
-    Calcula las tablas de posiciones divididas por conferencia.
+    Calcula las tablas de posiciones divididas por conferencia a partir
+    de la tabla equipo-partido (get_team_game).
     Retorna un diccionario con 'East' y 'West', cada uno con un DataFrame.
     """
-    if df_games is None or df_games.empty:
-        return {"East": pd.DataFrame(), "West": pd.DataFrame()}
-
-    df = df_games.copy()
-    c_fecha = _col(df, "FECHA","fecha","DATE","date")
-    c_loc   = _col(df, "LOCAL","home","HOME")
-    c_vis   = _col(df, "VISITANTE","away","AWAY")
-    c_pl    = _col(df, "PTS_LOCAL","pts_local","HOME_PTS")
-    c_pv    = _col(df, "PTS_VISITANTE","pts_visitante","AWAY_PTS")
-    if not all([c_fecha, c_loc, c_vis, c_pl, c_pv]): 
+    # Solo partidos jugados (con rival en partidos)
+    jugados = team_game[team_game["OPP"].notna()] if team_game is not None else None
+    if jugados is None or jugados.empty:
         return {"East": pd.DataFrame(), "West": pd.DataFrame()}
 
-    df[c_fecha] = pd.to_datetime(df[c_fecha], errors="coerce")
-    df = df.sort_values(c_fecha)
-
-    home = df.assign(
-        ABBR=df[c_loc], PTS_FOR=df[c_pl], PTS_AGAINST=df[c_pv],
-        WIN=(df[c_pl] > df[c_pv]).astype(int), LOSS=(df[c_pl] < df[c_pv]).astype(int),
-    )[["ABBR","PTS_FOR","PTS_AGAINST","WIN","LOSS",c_fecha]]
-
-    away = df.assign(
-        ABBR=df[c_vis], PTS_FOR=df[c_pv], PTS_AGAINST=df[c_pl],
-        WIN=(df[c_pv] > df[c_pl]).astype(int), LOSS=(df[c_pv] < df[c_pl]).astype(int),
-    )[["ABBR","PTS_FOR","PTS_AGAINST","WIN","LOSS",c_fecha]]
-
-    all_rows = pd.concat([home, away], ignore_index=True)
-
     tabla = (
-        all_rows.groupby("ABBR", as_index=False)
-        .agg(PJ=(c_fecha, "count"),
+        jugados.groupby("TEAM_ABBREVIATION", as_index=False, observed=True)
+        .agg(PJ=("FECHA", "count"),
              PG=("WIN", "sum"),
              PP=("LOSS", "sum"),
              PTS_FOR=("PTS_FOR", "sum"),
              PTS_AGAINST=("PTS_AGAINST", "sum"))
+        .rename(columns={"TEAM_ABBREVIATION": "ABBR"})
     )
     tabla["DIF"] = tabla["PTS_FOR"] - tabla["PTS_AGAINST"]
 
-    last_all = {t: [] for t in tabla["ABBR"]}
-    for _, r in df.iterrows():
-        h, a = r[c_loc], r[c_vis]
-        pl, pv = int(r[c_pl]), int(r[c_pv])
-        last_all[h].append("W" if pl > pv else "L")
-        last_all[a].append("W" if pv > pl else "L")
+    # team_game ya viene ordenada por fecha
+    resultados = jugados["WIN"].map({1: "W", 0: "L"})
+    last_all = resultados.groupby(jugados["TEAM_ABBREVIATION"], observed=True).agg(list)
 
     def take_last5(seq):
         tail = seq[-5:] if len(seq) >= 5 else seq
         tail = ([""] * (5 - len(tail))) + tail
         return tail
 
-    tabla["last5"] = tabla["ABBR"].map(lambda t: take_last5(last_all.get(t, [])))
+    tabla["last5"] = [take_last5(last_all.get(t, [])) for t in tabla["ABBR"]]
 
     # Agregar nombre, conferencia y LOGO desde equipos_df
     if {"TEAM_NAME", "LOGO_URL"}.issubset(equipos_df.columns):
@@ -382,7 +360,7 @@ def build_roster(jug_df: pd.DataFrame, abbr: str, name: str) -> pd.DataFrame:
 
     mask = pd.Series([False] * len(df))
     if c_abbr:
-        mask = mask | (df[c_abbr].astype(str) == str(abbr))
+        mask = mask | (df[c_abbr] == abbr)
     if c_name:
         mask = mask | (df[c_name].astype(str) == str(name))
 
@@ -729,7 +707,7 @@ with col_right:
     tab_cls, tab_roster = st.tabs(["Clasificaciones", "Jugadores"])
 
     with tab_cls:
-        standings = build_standings(partidos, equipos)
+        standings = build_standings(get_team_game(estadisticas=False), equipos)
         render_standings_html(standings, team_sel)
 
     with tab_roster:
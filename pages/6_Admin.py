@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 from utils import (
-	load_data, check_auth, init_session_state, get_current_user,
+	load_table, check_auth, init_session_state, get_current_user,
 	insert_jugador, update_jugador_team, delete_jugador, get_jugador_by_id,
 	get_partido_futuro, get_jugadores_por_equipo, cargar_partido_completo,
-	eliminar_partido, get_partido_jugado, minutos_decimal_a_mmss, mmss_a_minutos_decimal
+	eliminar_partido, get_partido_jugado, minutos_decimal_a_mmss, mmss_a_minutos_decimal,
+	cache_stats
 )
 
 st.set_page_config(page_title="Administración | NBA Stats App", layout="wide")
@@ -28,7 +29,8 @@ st.success(f"👤 Conectado como: {user.email if user else 'Usuario'}")
 st.markdown("---")
 
 # Cargar datos
-_, _, _, equipos, jugadores = load_data()
+equipos = load_table("equipos")
+jugadores = load_table("jugadores")
 
 # Obtener lista de equipos disponibles
 team_options = []
@@ -257,7 +259,7 @@ with tab4:
 	st.info("💡 Selecciona un partido futuro y carga las estadísticas de todos los jugadores.")
 	
 	# Cargar partidos futuros
-	partidos, partidos_futuros, _, equipos, jugadores = load_data()
+	partidos_futuros = load_table("partidos_futuros")
 	
 	if partidos_futuros.empty:
 		st.warning("⚠️ No hay partidos futuros disponibles.")
@@ -266,16 +268,12 @@ with tab4:
 		partidos_list = []
 		for _, row in partidos_futuros.iterrows():
 			game_id = str(row.get("GAME_ID", ""))
-			fecha = str(row.get("FECHA", ""))
+			fecha_parsed = row.get("FECHA")  # ya viene como datetime desde load_table
+			fecha = fecha_parsed.strftime("%Y-%m-%d") if pd.notna(fecha_parsed) else ""
 			local = str(row.get("LOCAL", ""))
 			visitante = str(row.get("VISITANTE", ""))
 			if game_id:
-				# Intentar parsear la fecha para ordenar correctamente
-				try:
-					fecha_parsed = pd.to_datetime(fecha, errors='coerce')
-					partidos_list.append((game_id, fecha, local, visitante, fecha_parsed))
-				except:
-					partidos_list.append((game_id, fecha, local, visitante, None))
+				partidos_list.append((game_id, fecha, local, visitante, fecha_parsed))
 		
 		# Ordenar por fecha descendente (más reciente primero)
 		partidos_list.sort(key=lambda x: x[4] if x[4] is not None and pd.notna(x[4]) else pd.Timestamp.min)
@@ -619,7 +617,7 @@ with tab5:
 	st.warning("⚠️ **ATENCIÓN:** Esta acción eliminará todos los boxscores del partido y lo moverá de vuelta a partidos futuros. Esta acción no se puede deshacer fácilmente.")
 	
 	# Cargar partidos jugados
-	partidos, _, _, equipos, jugadores = load_data()
+	partidos = load_table("partidos")
 	
 	if partidos.empty:
 		st.warning("⚠️ No hay partidos jugados disponibles.")
@@ -628,18 +626,14 @@ with tab5:
 		partidos_list = []
 		for _, row in partidos.iterrows():
 			game_id = str(row.get("GAME_ID", ""))
-			fecha = str(row.get("FECHA", ""))
+			fecha_parsed = row.get("FECHA")  # ya viene como datetime desde load_table
+			fecha = fecha_parsed.strftime("%Y-%m-%d") if pd.notna(fecha_parsed) else ""
 			local = str(row.get("LOCAL", ""))
 			visitante = str(row.get("VISITANTE", ""))
 			pts_local = row.get("PTS_LOCAL", 0)
 			pts_visitante = row.get("PTS_VISITANTE", 0)
 			if game_id:
-				# Intentar parsear la fecha para ordenar correctamente
-				try:
-					fecha_parsed = pd.to_datetime(fecha, errors='coerce')
-					partidos_list.append((game_id, fecha, local, visitante, pts_local, pts_visitante, fecha_parsed))
-				except:
-					partidos_list.append((game_id, fecha, local, visitante, pts_local, pts_visitante, None))
+				partidos_list.append((game_id, fecha, local, visitante, pts_local, pts_visitante, fecha_parsed))
 		
 		# Ordenar por fecha descendente (más reciente primero)
 		partidos_list.sort(key=lambda x: x[6] if x[6] is not None and pd.notna(x[6]) else pd.Timestamp.min, reverse=True)
@@ -685,6 +679,13 @@ with tab5:
 		else:
 			st.info("📭 No hay partidos jugados disponibles")
 
+# Estado del cache de datos
+st.markdown("---")
+with st.expander("📦 Memoria del cache de datos"):
+	stats = cache_stats()
+	st.caption(f"Total en memoria: {stats['MB'].sum():.1f} MB")
+	st.dataframe(stats, use_container_width=True, hide_index=True)
+
 # Footer
 st.markdown("---")
 if st.button("⬅ Volver al Dashboard"):
@@ -0,0 +1,91 @@
+import pandas as pd
+
+
+# ==============================================================
+# 🔮 MODELO DE PREDICCIONES (SOBRE LA TABLA EQUIPO-PARTIDO)
+# ==============================================================
+# Funciones puras: se pueden importar sin Streamlit ni Supabase
+# (scripts, pruebas). Reciben la tabla de utils.get_team_game.
+
+STATS_MODELO = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
+
+
+def precalcular_todos_promedios(team_game_df: pd.DataFrame) -> tuple[dict, dict, dict]:
+	"""
+	Precalcula todos los promedios ofensivos, defensivos y desvíos de todos
+	los equipos con un solo groupby sobre la tabla equipo-partido.
+
+	Args:
+		team_game_df: Tabla equipo-partido (get_team_game)
+
+	Returns:
+		tuple: (promedios_ofensivos, promedios_defensivos, desvios_puntos),
+		cada uno un diccionario {team_abbr: valores}
+	"""
+	promedios_of = {}
+	promedios_def = {}
+	desvios = {}
+
+	if team_game_df.empty or "PTS" not in team_game_df.columns:
+		return promedios_of, promedios_def, desvios
+
+	available_cols = [col for col in STATS_MODELO if col in team_game_df.columns]
+	rival_cols = [f"OPP_{col}" for col in available_cols]
+
+	# Las estadísticas son nulas donde faltan boxscores (del equipo o del rival):
+	# mean, std y count las ignoran, así que alcanza con un solo groupby
+	por_equipo = team_game_df.groupby("TEAM_ABBREVIATION", observed=True)
+	medias = por_equipo[available_cols + rival_cols].mean()
+	juegos = por_equipo[["PTS", "OPP_PTS"]].count()
+	desvio_pts = por_equipo["PTS"].std()
+
+	# Solo equipos con boxscores propios
+	equipos = juegos.index[juegos["PTS"] > 0]
+	hay_partidos = team_game_df["OPP"].notna().any()
+
+	for team in equipos:
+		team_str = str(team)
+		promedios_of[team_str] = dict(zip(available_cols, medias.loc[team, available_cols]))
+
+		desvio = desvio_pts.loc[team]
+		if juegos.loc[team, "PTS"] >= 2 and not pd.isna(desvio):
+			desvios[team_str] = float(desvio)
+		else:
+			desvios[team_str] = 0.0
+
+		if hay_partidos:
+			if juegos.loc[team, "OPP_PTS"] > 0:
+				promedios_def[team_str] = dict(zip(available_cols, medias.loc[team, rival_cols]))
+			else:
+				promedios_def[team_str] = {}
+
+	return promedios_of, promedios_def, desvios
+
+
+def calcular_record_actual(team_game_df: pd.DataFrame) -> pd.DataFrame:
+	"""
+	Calcula el record actual de cada equipo (PJ, PG, PP).
+
+	Args:
+		team_game_df: Tabla equipo-partido (get_team_game)
+
+	Returns:
+		pd.DataFrame: Columnas TEAM, PJ, PG y PP (vacío si no hay partidos)
+	"""
+	if team_game_df.empty:
+		return pd.DataFrame()
+
+	# Solo partidos jugados (con rival en partidos)
+	jugados = team_game_df[team_game_df["OPP"].notna()]
+
+	record = (
+		jugados.groupby("TEAM_ABBREVIATION", as_index=False, observed=True)
+		.agg(
+			PJ=("WIN", "count"),
+			PG=("WIN", "sum"),
+			PP=("LOSS", "sum")
+		)
+		.rename(columns={"TEAM_ABBREVIATION": "TEAM"})
+	)
+
+	return record
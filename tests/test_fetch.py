@@ -0,0 +1,222 @@
+"""
+fetch_all contra un servidor PostgREST simulado (httpx.MockTransport) con
+el cliente real de postgrest-py: formato CSV, paginación keyset, control
+de filas del modo paralelo y reintentos / ErrorDescarga.
+"""
+import json
+import os
+import re
+import sys
+
+import httpx
+import pandas as pd
+import pytest
+from postgrest import SyncPostgrestClient
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import utils  # noqa: E402
+
+
+class ServidorFalso:
+    """
+    PostgREST mínimo sobre un DataFrame por tabla: select, order, offset,
+    limit, filtros gt / eq / or (los que arma utils), conteo exacto con
+    HEAD y respuestas JSON o CSV.
+
+    Args:
+        tablas: {nombre: DataFrame}
+        max_rows: Como db-max-rows de PostgREST: corta cada respuesta
+        fallas: Respuestas de error a devolver antes de las normales
+    """
+
+    def __init__(self, tablas: dict, max_rows: int = None, fallas: list = None):
+        self.tablas = tablas
+        self.max_rows = max_rows
+        self.fallas = list(fallas or [])
+        self.pedidos = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.pedidos.append(request)
+        if self.fallas:
+            falla = self.fallas.pop(0)
+            if isinstance(falla, Exception):
+                raise falla
+            return falla
+        tabla = request.url.path.rsplit("/", 1)[-1]
+        df = self.tablas[tabla]
+        params = request.url.params
+
+        for col, valor in params.multi_items():
+            if col == "or":
+                df = df[self._condicion_or(df, valor[1:-1])]
+            elif col not in ("select", "order", "offset", "limit"):
+                df = df[self._condicion(df, col, valor)]
+        if "order" in params:
+            df = df.sort_values([c.split(".")[0] for c in params["order"].split(",")])
+
+        total = len(df)
+        inicio = int(params.get("offset", 0))
+        limite = int(params["limit"]) if "limit" in params else total
+        if self.max_rows is not None:
+            limite = min(limite, self.max_rows)
+        df = df.iloc[inicio:inicio + limite]
+        if params.get("select", "*") != "*":
+            df = df[params["select"].split(",")]
+
+        rango = f"{inicio}-{inicio + len(df) - 1}" if len(df) else "*"
+        headers = {"content-range": f"{rango}/{total}"}
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+        if request.headers.get("accept") == "text/csv":
+            return httpx.Response(200, text=df.to_csv(index=False), headers=headers)
+        return httpx.Response(200, json=json.loads(df.to_json(orient="records")), headers=headers)
+
+    @staticmethod
+    def _condicion(df, col, expresion):
+        operador, valor = expresion.split(".", 1)
+        valor = valor.strip('"')
+        columna = df[col]
+        if pd.api.types.is_numeric_dtype(columna):
+            valor = float(valor)
+        return columna > valor if operador == "gt" else columna == valor
+
+    def _condicion_or(self, df, expresion):
+        resultado = pd.Series(False, index=df.index)
+        for parte in re.findall(r'and\([^)]*\)|[^,]+', expresion):
+            if parte.startswith("and("):
+                condicion = pd.Series(True, index=df.index)
+                for sub in parte[4:-1].split(","):
+                    col, resto = sub.split(".", 1)
+                    condicion &= self._condicion(df, col, resto)
+            else:
+                col, resto = parte.split(".", 1)
+                condicion = self._condicion(df, col, resto)
+            resultado |= condicion
+        return resultado
+
+
+def _boxscores(n: int) -> pd.DataFrame:
+    """n filas con clave compuesta (GAME_ID con ceros a la izquierda, PLAYER_ID)."""
+    return pd.DataFrame({
+        "GAME_ID": [f"00223{i // 10:05d}" for i in range(n)],
+        "PLAYER_ID": [i % 10 + 1 for i in range(n)],
+        "TEAM_ABBREVIATION": ["ATL" if i % 2 else "BOS" for i in range(n)],
+        "PLAYER_NAME": [f"Jugador, {i}" for i in range(n)],
+        "PTS": [i % 31 for i in range(n)],
+    })
+
+
+def _partidos(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "GAME_ID": [f"00223{i:05d}" for i in range(n)],
+        "LOCAL": ["ATL"] * n,
+        "VISITANTE": ["BOS"] * n,
+        "PTS_LOCAL": [100 + i % 20 for i in range(n)],
+        "PTS_VISITANTE": [99 + i % 7 for i in range(n)],
+    })
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    """Devuelve una función que arma el servidor falso y un cliente postgrest sobre él."""
+    monkeypatch.setattr(utils, "FETCH_BACKOFF_BASE", 0.0)
+
+    def armar(**kwargs):
+        falso = ServidorFalso(**kwargs)
+        http = httpx.Client(base_url="http://pgrst.test", transport=httpx.MockTransport(falso))
+        cliente = SyncPostgrestClient("http://pgrst.test", http_client=http)
+        return falso, cliente
+
+    return armar
+
+
+def _ordenado(df: pd.DataFrame, clave: list) -> pd.DataFrame:
+    return df.sort_values(clave).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("formato", ["json", "csv"])
+@pytest.mark.parametrize("modo", ["offset", "parallel", "keyset"])
+def test_descarga_completa(servidor, modo, formato):
+    esperado = _boxscores(95)
+    falso, cliente = servidor(tablas={"boxscores": esperado})
+
+    df = utils.fetch_all("boxscores", batch_size=20, mode=modo, client=cliente, formato=formato)
+
+    df = _ordenado(df, ["GAME_ID", "PLAYER_ID"])
+    assert df["GAME_ID"].tolist() == esperado["GAME_ID"].tolist()
+    assert df["PLAYER_ID"].tolist() == esperado["PLAYER_ID"].tolist()
+    assert df["PLAYER_NAME"].tolist() == esperado["PLAYER_NAME"].tolist()
+    assert df["PTS"].tolist() == esperado["PTS"].tolist()
+
+
+def test_csv_conserva_ceros_a_la_izquierda(servidor):
+    falso, cliente = servidor(tablas={"partidos": _partidos(5)})
+
+    df = utils.fetch_all("partidos", batch_size=2, mode="offset", client=cliente, formato="csv")
+
+    assert all(p.headers["accept"] == "text/csv" for p in falso.pedidos)
+    assert df["GAME_ID"].tolist() == _partidos(5)["GAME_ID"].tolist()
+
+
+def test_keyset_sigue_con_paginas_cortas(servidor):
+    # max-rows menor que batch_size: todas las páginas llegan cortas
+    falso, cliente = servidor(tablas={"boxscores": _boxscores(45)}, max_rows=7)
+
+    df = utils.fetch_all("boxscores", batch_size=20, mode="keyset", client=cliente)
+
+    assert len(df) == 45
+    assert not df.duplicated(["GAME_ID", "PLAYER_ID"]).any()
+    # Ninguna página usa OFFSET: cada una sigue desde la última clave
+    assert all("offset" not in p.url.params for p in falso.pedidos)
+
+
+def test_offset_avanza_lo_que_llego(servidor):
+    falso, cliente = servidor(tablas={"partidos": _partidos(30)}, max_rows=7)
+
+    df = utils.fetch_all("partidos", batch_size=20, mode="offset", client=cliente)
+
+    assert df["GAME_ID"].tolist() == _partidos(30)["GAME_ID"].tolist()
+
+
+def test_paralelo_rechaza_paginas_incompletas(servidor):
+    # El conteo dice 30 filas pero cada página trae a lo sumo 7
+    falso, cliente = servidor(tablas={"partidos": _partidos(30)}, max_rows=7)
+
+    with pytest.raises(utils.ErrorDescarga, match="21 de 30"):
+        utils.fetch_all("partidos", batch_size=10, mode="parallel", client=cliente)
+
+
+def test_reintenta_errores_transitorios(servidor):
+    fallas = [
+        httpx.ConnectError("sin conexión"),
+        httpx.Response(503, json={"code": "PGRST001", "message": "sin base"}),
+    ]
+    falso, cliente = servidor(tablas={"partidos": _partidos(3)}, fallas=fallas)
+
+    df = utils.fetch_all("partidos", batch_size=10, mode="offset", client=cliente)
+
+    assert len(df) == 3
+    # 2 fallas + la página con datos + la página vacía del final
+    assert len(falso.pedidos) == 4
+
+
+def test_error_permanente_no_se_reintenta(servidor):
+    fallas = [httpx.Response(401, json={"code": "42501", "message": "permission denied"})]
+    falso, cliente = servidor(tablas={"partidos": _partidos(3)}, fallas=fallas)
+
+    with pytest.raises(utils.ErrorDescarga, match="permission denied"):
+        utils.fetch_all("partidos", batch_size=10, mode="offset", client=cliente)
+    assert len(falso.pedidos) == 1
+
+
+def test_agotar_reintentos_lanza_error_descarga(servidor, monkeypatch):
+    monkeypatch.setattr(utils, "FETCH_RETRIES", 2)
+    fallas = [httpx.Response(503, text="service unavailable")] * 3
+    falso, cliente = servidor(tablas={"partidos": _partidos(3)}, fallas=fallas)
+
+    with pytest.raises(utils.ErrorDescarga):
+        utils.fetch_all("partidos", batch_size=10, mode="parallel", client=cliente)
+    # Una sola capa de reintentos: 3 intentos del conteo, sin los de postgrest-py
+    assert len(falso.pedidos) == 3
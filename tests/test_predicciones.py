@@ -0,0 +1,258 @@
+"""
+Equivalencia de predicciones.py (vectorizado sobre la tabla equipo-partido)
+con la implementación original de pages/3_Predicciones.py, sobre un set
+chico de partidos.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import utils  # noqa: E402
+from predicciones import calcular_record_actual, precalcular_todos_promedios  # noqa: E402
+
+STATS = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
+
+
+# --------------------------------------------------------------
+# Referencia: funciones originales, copiadas sin cambios salvo el nombre
+# --------------------------------------------------------------
+
+def _precalcular_original(
+    partidos_df: pd.DataFrame,
+    boxscores_df: pd.DataFrame
+) -> tuple[dict, dict, dict]:
+    """
+    Precalcula todos los promedios ofensivos, defensivos y desvíos de todos los equipos.
+    Retorna (promedios_ofensivos, promedios_defensivos, desvios_puntos)
+    donde cada uno es un diccionario {team_abbr: valores}
+    """
+    promedios_of = {}
+    promedios_def = {}
+    desvios = {}
+    
+    if boxscores_df.empty:
+        return promedios_of, promedios_def, desvios
+    
+    # Obtener todos los equipos únicos
+    equipos_unicos = boxscores_df["TEAM_ABBREVIATION"].dropna().unique()
+    
+    # Precalcular estadísticas por partido para todos los equipos
+    stats_cols = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
+    available_cols = [col for col in stats_cols if col in boxscores_df.columns]
+    
+    # Agrupar por equipo y partido para calcular promedios ofensivos y desvíos
+    for team in equipos_unicos:
+        team_str = str(team)
+        team_boxscores = boxscores_df[boxscores_df["TEAM_ABBREVIATION"] == team_str].copy()
+        
+        if team_boxscores.empty:
+            continue
+        
+        # Calcular promedios ofensivos
+        team_stats_per_game = team_boxscores.groupby("GAME_ID")[available_cols].sum().reset_index()
+        promedios_of[team_str] = {}
+        for col in available_cols:
+            promedios_of[team_str][col] = team_stats_per_game[col].mean()
+        
+        # Calcular desvío de puntos
+        if "PTS" in team_stats_per_game.columns:
+            puntos_por_partido = team_stats_per_game["PTS"]
+            if len(puntos_por_partido) >= 2:
+                desvio = puntos_por_partido.std()
+                desvios[team_str] = float(desvio) if not pd.isna(desvio) else 0.0
+            else:
+                desvios[team_str] = 0.0
+        else:
+            desvios[team_str] = 0.0
+    
+    # Precalcular promedios defensivos
+    if not partidos_df.empty:
+        # Crear un diccionario de estadísticas por partido para acceso rápido
+        stats_por_partido = {}
+        for game_id in boxscores_df["GAME_ID"].unique():
+            game_id_str = str(game_id)
+            game_boxscores = boxscores_df[boxscores_df["GAME_ID"].astype(str) == game_id_str]
+            stats_por_partido[game_id_str] = {}
+            for team in game_boxscores["TEAM_ABBREVIATION"].unique():
+                team_str = str(team)
+                team_game_stats = game_boxscores[game_boxscores["TEAM_ABBREVIATION"] == team_str]
+                stats_por_partido[game_id_str][team_str] = team_game_stats[available_cols].sum().to_dict()
+        
+        # Para cada equipo, calcular promedios defensivos
+        for team in equipos_unicos:
+            team_str = str(team)
+            partidos_equipo = partidos_df[
+                (partidos_df["LOCAL"] == team_str) | (partidos_df["VISITANTE"] == team_str)
+            ].copy()
+            
+            if partidos_equipo.empty:
+                promedios_def[team_str] = {}
+                continue
+            
+            rival_stats = []
+            for _, partido in partidos_equipo.iterrows():
+                game_id_str = str(partido["GAME_ID"])
+                local = str(partido["LOCAL"])
+                visitante = str(partido["VISITANTE"])
+                
+                # Determinar el rival
+                rival = visitante if local == team_str else local
+                
+                # Obtener estadísticas del rival desde el diccionario precalculado
+                if game_id_str in stats_por_partido and rival in stats_por_partido[game_id_str]:
+                    rival_stats.append(stats_por_partido[game_id_str][rival])
+            
+            if rival_stats:
+                df_rival_stats = pd.DataFrame(rival_stats)
+                promedios_def[team_str] = {}
+                for col in available_cols:
+                    promedios_def[team_str][col] = df_rival_stats[col].mean()
+            else:
+                promedios_def[team_str] = {}
+    
+    return promedios_of, promedios_def, desvios
+
+
+def _record_original(partidos_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula el record actual de cada equipo (PJ, PG, PP).
+    """
+    if partidos_df.empty:
+        return pd.DataFrame()
+    
+    # Verificar columnas necesarias
+    c_loc = None
+    c_vis = None
+    c_pl = None
+    c_pv = None
+    
+    for col in partidos_df.columns:
+        if col.upper() in ["LOCAL", "HOME"]:
+            c_loc = col
+        elif col.upper() in ["VISITANTE", "AWAY", "VISITOR"]:
+            c_vis = col
+        elif col.upper() in ["PTS_LOCAL", "HOME_PTS"]:
+            c_pl = col
+        elif col.upper() in ["PTS_VISITANTE", "AWAY_PTS", "VISITOR_PTS"]:
+            c_pv = col
+    
+    if not all([c_loc, c_vis, c_pl, c_pv]):
+        return pd.DataFrame()
+    
+    # Crear filas para local y visitante
+    home = partidos_df.assign(
+        TEAM=partidos_df[c_loc],
+        WIN=(partidos_df[c_pl] > partidos_df[c_pv]).astype(int),
+        LOSS=(partidos_df[c_pl] < partidos_df[c_pv]).astype(int)
+    )[["TEAM", "WIN", "LOSS"]]
+    
+    away = partidos_df.assign(
+        TEAM=partidos_df[c_vis],
+        WIN=(partidos_df[c_pv] > partidos_df[c_pl]).astype(int),
+        LOSS=(partidos_df[c_pv] < partidos_df[c_pl]).astype(int)
+    )[["TEAM", "WIN", "LOSS"]]
+    
+    # Combinar y agregar
+    all_games = pd.concat([home, away], ignore_index=True)
+    record = all_games.groupby("TEAM", as_index=False).agg(
+        PJ=("WIN", "count"),
+        PG=("WIN", "sum"),
+        PP=("LOSS", "sum")
+    )
+    
+    return record
+
+
+# (GAME_ID, local, visitante, pts local, pts visitante, equipos con boxscores)
+PARTIDOS = [
+    ("0022300001", "ATL", "BOS", 110, 102, ("ATL", "BOS")),
+    ("0022300002", "BOS", "CHI", 99, 104, ("BOS", "CHI")),
+    ("0022300003", "CHI", "ATL", 120, 118, ("CHI", "ATL")),
+    # DAL no tiene boxscores propios: no entra en los promedios ofensivos,
+    # y ATL juega contra un rival sin boxscores
+    ("0022300004", "DAL", "ATL", 95, 101, ("ATL",)),
+    # MIA y NYK juegan un solo partido: desvío 0.0
+    ("0022300005", "MIA", "NYK", 88, 91, ("MIA", "NYK")),
+    # El único rival de PHX no tiene boxscores: promedios defensivos vacíos
+    ("0022300006", "PHX", "SAS", 130, 100, ("PHX",)),
+]
+
+
+@pytest.fixture
+def datos_locales(tmp_path, monkeypatch):
+    """Escribe partidos y boxscores como CSV y los sirve con LocalSource."""
+    partidos, boxscores = [], []
+    for n, (game_id, local, visitante, pl, pv, con_box) in enumerate(PARTIDOS):
+        partidos.append({
+            "GAME_ID": game_id, "FECHA": f"2023-10-{24 + n}", "LOCAL": local,
+            "VISITANTE": visitante, "PTS_LOCAL": pl, "PTS_VISITANTE": pv,
+        })
+        for equipo in con_box:
+            pts = pl if equipo == local else pv
+            for jugador in range(3):
+                fila = {
+                    "GAME_ID": game_id, "TEAM_ABBREVIATION": equipo,
+                    "PLAYER_ID": len(boxscores) + 1,
+                    "PLAYER_NAME": f"{equipo} {jugador}", "MIN": 30.0,
+                }
+                for i, stat in enumerate(STATS):
+                    fila[stat] = (pts // 3 if stat == "PTS" else (n + 1) * (i + jugador + 1) % 17)
+                boxscores.append(fila)
+    pd.DataFrame(partidos).to_csv(tmp_path / "partido.csv", index=False)
+    pd.DataFrame(boxscores).to_csv(tmp_path / "boxscores.csv", index=False)
+
+    monkeypatch.setattr(utils, "get_data_source", lambda: utils.LocalSource(str(tmp_path)))
+    utils.clear_cache()
+    yield utils.load_table("partidos"), utils.load_table("boxscores")
+    utils.clear_cache()
+
+
+def _iguales(a, b) -> bool:
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_iguales(a[k], b[k]) for k in a)
+    return bool(np.isclose(float(a), float(b), rtol=1e-9, atol=1e-9))
+
+
+def test_precalcular_equivale_a_la_version_por_bucles(datos_locales):
+    partidos, boxscores = datos_locales
+    esperado = _precalcular_original(partidos, boxscores)
+    obtenido = precalcular_todos_promedios(utils.get_team_game())
+
+    for nombre, a, b in zip(("ofensivos", "defensivos", "desvios"), esperado, obtenido):
+        assert _iguales(a, b), nombre
+
+
+def test_record_equivale_a_la_version_original(datos_locales):
+    partidos, _ = datos_locales
+    esperado = _record_original(partidos).sort_values("TEAM").reset_index(drop=True)
+    obtenido = calcular_record_actual(utils.get_team_game(estadisticas=False))
+    obtenido = obtenido.sort_values("TEAM").reset_index(drop=True)
+
+    assert obtenido["TEAM"].astype(str).tolist() == esperado["TEAM"].tolist()
+    for col in ("PJ", "PG", "PP"):
+        assert obtenido[col].astype(int).tolist() == esperado[col].tolist(), col
+
+
+def test_casos_borde(datos_locales):
+    promedios_of, promedios_def, desvios = precalcular_todos_promedios(utils.get_team_game())
+
+    # Equipo sin boxscores propios
+    assert "DAL" not in promedios_of and "DAL" not in desvios
+    # Rival sin boxscores: ese partido no cuenta para los promedios defensivos
+    assert promedios_def["PHX"] == {}
+    assert promedios_def["ATL"]["PTS"] == pytest.approx((102 // 3 * 3 + 120 // 3 * 3) / 2)
+    # Un solo partido: desvío 0.0
+    assert desvios["MIA"] == 0.0 and desvios["NYK"] == 0.0
+    assert desvios["ATL"] > 0.0
+
+
+def test_precalcular_sin_datos():
+    vacia = pd.DataFrame(columns=["TEAM_ABBREVIATION", "OPP", "PTS", "OPP_PTS"])
+    assert precalcular_todos_promedios(vacia) == ({}, {}, {})
+    assert calcular_record_actual(vacia).empty
@@ -1,174 +1,2027 @@
+from __future__ import annotations
+
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
+import numpy as np
 from datetime import datetime
+import os
+import json
+import io
+import threading
+from abc import ABC, abstractmethod
+from types import MappingProxyType
+import time
+import random
+import re
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import TYPE_CHECKING
 
-# Conexión Supabase compartida
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
+# Helpers puros, reexportados para las páginas
+from formato import minutos_decimal_a_mmss, mmss_a_minutos_decimal
 
-# Cliente base anónimo (para acceso sin autenticación)
-supabase_anon: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# supabase, httpx y duckdb se importan recién al usarlos: importar utils no
+# necesita secrets ni red (scripts, pruebas, fuente local)
+if TYPE_CHECKING:
+	import httpx
+	from supabase import Client
 
+# Copy-on-Write: las vistas sin copia de los DataFrames cacheados copian una
+# columna recién cuando alguien la modifica (siempre activo desde pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+	pd.set_option("mode.copy_on_write", True)
+
+# Pool de conexiones HTTP/2 keep-alive compartido por todos los clientes del
+# proceso (anónimo, login y sesiones autenticadas): las sesiones reutilizan
+# las conexiones abiertas en lugar de hacer un handshake TLS cada una.
+HTTP_MAX_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 60.0  # segundos que una conexión ociosa queda abierta
+HTTP_TIMEOUT = 120.0
 
-# ==============================================================
-# 🕐 FUNCIONES DE FORMATO DE MINUTOS
-# ==============================================================
 
-def minutos_decimal_a_mmss(minutos_decimal: float) -> str:
+@st.cache_resource
+def _get_http_pool() -> httpx.Client:
+	"""Cliente httpx compartido (HTTP/2, keep-alive), uno por proceso."""
+	import httpx
+
+	return httpx.Client(
+		http2=True,
+		follow_redirects=True,
+		timeout=HTTP_TIMEOUT,
+		limits=httpx.Limits(
+			max_connections=HTTP_MAX_CONNECTIONS,
+			max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+			keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+		),
+	)
+
+
+def _nuevo_cliente() -> Client:
 	"""
-	Convierte minutos decimales (ej: 25.5) a formato mm:ss (ej: "25:30").
-	
-	Args:
-		minutos_decimal: Minutos en formato decimal
-		
-	Returns:
-		str: Formato mm:ss
+	Cliente Supabase sobre el pool compartido. No guarda ni renueva sesiones
+	por su cuenta: los tokens de cada usuario viven en st.session_state.
 	"""
-	if minutos_decimal is None or pd.isna(minutos_decimal):
-		return "0:00"
-	
-	try:
-		minutos_decimal = float(minutos_decimal)
-		minutos = int(minutos_decimal)
-		segundos = int((minutos_decimal - minutos) * 60)
-		return f"{minutos}:{segundos:02d}"
-	except (ValueError, TypeError):
-		return "0:00"
+	from supabase import create_client, ClientOptions
+
+	return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"], options=ClientOptions(
+		httpx_client=_get_http_pool(),
+		auto_refresh_token=False,
+		persist_session=False,
+	))
 
 
-def mmss_a_minutos_decimal(mmss: str) -> float:
+@st.cache_resource
+def get_supabase_anon() -> Client:
 	"""
-	Convierte formato mm:ss (ej: "25:30") a minutos decimales (ej: 25.5).
-	
-	Args:
-		mmss: String en formato mm:ss o mm:ss
-		
-	Returns:
-		float: Minutos en formato decimal
+	Cliente base anónimo (para acceso sin autenticación), compartido por
+	todo el proceso. Se crea la primera vez que se usa, no al importar utils.
 	"""
-	if not mmss or mmss == "":
-		return 0.0
-	
-	# Si ya es un número, retornarlo
-	try:
-		return float(mmss)
-	except (ValueError, TypeError):
-		pass
-	
-	# Intentar parsear formato mm:ss
-	try:
-		if ":" in str(mmss):
-			parts = str(mmss).split(":")
-			minutos = int(parts[0])
-			segundos = int(parts[1]) if len(parts) > 1 else 0
-			return minutos + segundos / 60.0
-	except (ValueError, TypeError, IndexError):
-		pass
-	
-	return 0.0
+	return _nuevo_cliente()
+
+
+def __getattr__(nombre: str):
+	# Compatibilidad: utils.supabase_anon / SUPABASE_URL / SUPABASE_KEY
+	if nombre == "supabase_anon":
+		return get_supabase_anon()
+	if nombre in ("SUPABASE_URL", "SUPABASE_KEY"):
+		return st.secrets[nombre]
+	raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class ClienteSesion:
+	"""
+	Cliente de un usuario autenticado. No abre conexiones propias: arma las
+	consultas con el cliente anónimo compartido y les agrega el token del
+	usuario en el header Authorization de cada request (RLS lo ve como
+	usuario autenticado).
+	"""
+
+	def __init__(self, base: Client, access_token: str):
+		self._base = base
+		self._authorization = f"Bearer {access_token}"
+
+	def table(self, table_name: str):
+		from httpx import Headers
+
+		builder = self._base.table(table_name)
+		# Copia: los headers del builder son los del cliente compartido
+		headers = Headers(builder.headers)
+		headers["Authorization"] = self._authorization
+		builder.headers = headers
+		return builder
+
+	from_ = table
+
+
+# Segundos antes del vencimiento del access token en que se lo renueva
+TOKEN_MARGEN = 60
+
+
+def _access_token_vigente() -> str:
+	"""
+	Access token de la sesión. Si está por vencer se renueva con el refresh
+	token (antes lo hacía el cliente guardado por sesión).
+	"""
+	expira = st.session_state.get("token_expira")
+	if expira and time.time() > expira - TOKEN_MARGEN and st.session_state.refresh_token:
+		try:
+			response = _nuevo_cliente().auth.refresh_session(st.session_state.refresh_token)
+			if response.session:
+				_guardar_tokens(response.session)
+		except Exception:
+			pass  # se sigue con el token actual; Supabase lo rechazará si venció
+	return st.session_state.access_token
 
 
 def get_supabase_client() -> Client:
 	"""
 	Obtiene el cliente de Supabase apropiado:
-	- Si hay un token de autenticación, usa el cliente autenticado guardado
+	- Si hay un token de autenticación, un ClienteSesion con ese token
 	- Si no, usa el cliente anónimo (respeta RLS automáticamente)
+	Ambos comparten el mismo pool de conexiones.
 	"""
 	init_session_state()
 	
-	# Si hay un cliente autenticado guardado, usarlo
-	if "supabase_client_auth" in st.session_state and st.session_state.supabase_client_auth:
-		return st.session_state.supabase_client_auth
+	if check_auth():
+		return ClienteSesion(get_supabase_anon(), _access_token_vigente())
 	
 	# Si no hay token, usar cliente anónimo (RLS se aplicará automáticamente)
-	return supabase_anon
+	return get_supabase_anon()
+
+
+# Clave primaria de cada tabla. Se usa para ordenar la paginación y que
+# las páginas pedidas en paralelo no se solapen ni dejen huecos.
+TABLE_KEYS = {
+	"partidos": ["GAME_ID"],
+	"partidos_futuros": ["GAME_ID"],
+	"boxscores": ["GAME_ID", "PLAYER_ID"],
+	"equipos": ["TEAM_ABBREVIATION"],
+	"jugadores": ["PLAYER_ID"],
+}
+
+# Modo de descarga por defecto de cada tabla (las no listadas usan "offset").
+# "parallel" es opcional: conviene para tablas grandes sin clave para keyset
+# o con filtro; las tablas chicas entran en una sola página. load_data()
+# descarga además las tablas a la vez entre sí (ver _cargar_tablas).
+FETCH_MODES = {
+	"boxscores": "keyset",
+}
+
+# Formato de descarga de cada tabla (las no listadas usan "json").
+# "csv" pide las páginas como text/csv y las lee directo con pd.read_csv.
+FETCH_FORMATS = {
+	"boxscores": "csv",
+}
+
+# Columnas que en CSV se leen como texto aunque parezcan números
+# (GAME_ID tiene ceros a la izquierda)
+CSV_TEXT_COLUMNS = ["GAME_ID"]
 
+# Máximo de páginas descargadas a la vez en modo paralelo
+FETCH_MAX_WORKERS = 4
 
-def fetch_all(table_name: str, batch_size: int = 1000) -> pd.DataFrame:
+# Reintentos por página ante errores transitorios (red, timeouts, 5xx).
+# La espera entre intentos es aleatoria entre 0 y
+# min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2**intento) segundos.
+FETCH_RETRIES = 4
+FETCH_BACKOFF_BASE = 0.5
+FETCH_BACKOFF_MAX = 8.0
+
+# Códigos de Postgres / PostgREST que indican un problema pasajero del
+# servidor (conexión, recursos, timeout de la consulta). PostgREST los
+# responde con un estado 5xx.
+_CODIGOS_TRANSITORIOS = ("08", "40001", "53", "57014", "PGRST000", "PGRST001", "PGRST002")
+
+
+class ErrorDescarga(Exception):
+	"""Una tabla no se pudo descargar completa (ni siquiera con reintentos)."""
+
+
+def _es_transitorio(error: Exception) -> bool:
+	"""
+	True si vale la pena reintentar: errores de red o timeouts de httpx y
+	respuestas 5xx / 429. Los errores de permisos (RLS) o de consultas
+	inválidas fallarían igual en el próximo intento.
+	"""
+	import httpx
+	from postgrest.exceptions import APIError
+
+	if isinstance(error, (httpx.TransportError, httpx.TimeoutException)):
+		return True
+	if not isinstance(error, APIError):
+		return False
+	code = str(error.code or "")
+	if code.isdigit() and len(code) == 3:
+		# Respuesta HTTP sin JSON de PostgREST (ej: 502 del gateway)
+		return int(code) >= 500 or int(code) == 429
+	return code.startswith(_CODIGOS_TRANSITORIOS)
+
+
+def _con_reintentos(pedir, table_name: str):
+	"""
+	Ejecuta pedir() (una página o un conteo) reintentando los errores
+	transitorios con espera exponencial y jitter. Es la única capa de
+	reintentos: las consultas se arman con .retry(False) (ver _sin_reintentos).
+	Cualquier otra excepción (por ejemplo un TypeError) es un bug y se
+	propaga tal cual, sin reintentar.
+	
+	Raises:
+		ErrorDescarga: si el servidor rechazó la consulta (APIError no
+			transitorio) o se agotaron los intentos
+	"""
+	from postgrest.exceptions import APIError
+
+	for intento in range(FETCH_RETRIES + 1):
+		try:
+			return pedir()
+		except Exception as e:
+			transitorio = _es_transitorio(e)
+			if not transitorio and not isinstance(e, APIError):
+				raise
+			if not transitorio or intento == FETCH_RETRIES:
+				raise ErrorDescarga(f"Error al acceder a {table_name}: {e}") from e
+			time.sleep(random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2 ** intento)))
+
+
+def _sin_reintentos(query):
+	"""
+	Desactiva los reintentos propios de postgrest-py (503/520 con esperas de
+	1, 2 y 4 s) para que no se multipliquen con los de _con_reintentos.
+	"""
+	return query.retry(False)
+
+
+def _ordenar_por_clave(query, table_name: str):
+	"""Agrega ORDER BY sobre la clave primaria de la tabla (si se conoce)."""
+	for col in TABLE_KEYS.get(table_name, []):
+		query = query.order(col)
+	return query
+
+
+def _base_query(client: Client, table_name: str, select: str = "*", filtro: str = None, **kwargs):
+	"""SELECT sobre la tabla con el filtro OR de PostgREST opcional."""
+	query = client.table(table_name).select(select, **kwargs)
+	if filtro:
+		query = query.or_(filtro)
+	return query
+
+
+def _contar_filas(client: Client, table_name: str, filtro: str = None) -> int:
+	"""Obtiene la cantidad de filas visibles de una tabla sin descargarlas."""
+	response = _con_reintentos(
+		lambda: _sin_reintentos(_base_query(client, table_name, "*", filtro, count="exact", head=True)).execute(),
+		table_name,
+	)
+	return response.count or 0
+
+
+def _ejecutar_pagina(query, table_name: str, formato: str) -> pd.DataFrame:
+	"""
+	Ejecuta la consulta de una página con reintentos y la convierte enseguida
+	en un DataFrame con las columnas numéricas ya compactadas. Así la lista
+	de dicts del JSON (o el texto del CSV) se libera página a página y nunca
+	conviven todas las filas como objetos Python con el DataFrame final.
+	"""
+	query = _sin_reintentos(query)
+	if formato == "csv":
+		texto = _con_reintentos(lambda: query.csv().execute().data, table_name)
+		if not texto:
+			return pd.DataFrame()
+		df = pd.read_csv(
+			io.StringIO(texto),
+			dtype={col: str for col in CSV_TEXT_COLUMNS},
+			keep_default_na=False,
+			na_values=[""],
+		)
+	else:
+		df = pd.DataFrame(_con_reintentos(lambda: query.execute().data, table_name))
+	return _compactar_numericas(table_name, df)
+
+
+def _juntar_paginas(paginas: list) -> pd.DataFrame:
+	"""Arma el DataFrame final con las páginas descargadas, en orden."""
+	paginas = [p for p in paginas if len(p)]
+	if not paginas:
+		return pd.DataFrame()
+	if len(paginas) == 1:
+		return paginas[0]
+	return pd.concat(paginas, ignore_index=True)
+
+
+def _fetch_offset(client: Client, table_name: str, batch_size: int, select: str = "*", filtro: str = None, formato: str = "json") -> list:
+	"""
+	Descarga la tabla página a página con .range(), una tras otra.
+	Si una página falla se reintenta desde el mismo offset.
+	"""
+	paginas = []
+	start = 0
+	while True:
+		query = _base_query(client, table_name, select, filtro)
+		query = _ordenar_por_clave(query, table_name).range(start, start + batch_size - 1)
+		batch = _ejecutar_pagina(query, table_name, formato)
+		if len(batch) == 0:
+			break
+		paginas.append(batch)
+		# Avanza lo que llegó: el max-rows del servidor puede cortar la página
+		start += len(batch)
+	return paginas
+
+
+def _fetch_parallel(client: Client, table_name: str, batch_size: int, max_workers: int, select: str = "*", filtro: str = None, formato: str = "json") -> list:
+	"""
+	Cuenta las filas de la tabla y descarga todas sus páginas en paralelo.
+	Las páginas se reensamblan en orden. Cada página se reintenta por su
+	cuenta; si alguna falla del todo, o si las páginas no suman el total
+	contado, se lanza ErrorDescarga.
+	"""
+	total = _contar_filas(client, table_name, filtro)
+
+	def fetch_page(start: int):
+		query = _base_query(client, table_name, select, filtro)
+		query = _ordenar_por_clave(query, table_name).range(start, start + batch_size - 1)
+		return _ejecutar_pagina(query, table_name, formato)
+
+	starts = list(range(0, total, batch_size))
+	if not starts:
+		return []
+
+	with ThreadPoolExecutor(max_workers=min(max_workers, len(starts))) as executor:
+		futures = [executor.submit(fetch_page, start) for start in starts]
+	paginas = [future.result() for future in futures]
+	# Si el servidor corta las páginas (max-rows < batch_size) o la tabla
+	# cambió entre el conteo y la descarga, quedarían huecos entre páginas
+	filas = sum(len(p) for p in paginas)
+	if filas != total:
+		raise ErrorDescarga(
+			f"Descarga incompleta de {table_name}: {filas} de {total} filas "
+			f"(¿max-rows del servidor menor que batch_size={batch_size}?)"
+		)
+	return paginas
+
+
+def _filtro_keyset(key_cols: list, last_row: dict) -> str:
+	"""
+	Construye el filtro PostgREST "fila > última clave vista" para una clave
+	(posiblemente compuesta). Para (GAME_ID, PLAYER_ID) queda:
+	GAME_ID.gt.g,and(GAME_ID.eq.g,PLAYER_ID.gt.p)
+	"""
+	condiciones = []
+	for i, col in enumerate(key_cols):
+		partes = [f'{prev}.eq."{last_row[prev]}"' for prev in key_cols[:i]]
+		partes.append(f'{col}.gt."{last_row[col]}"')
+		if len(partes) == 1:
+			condiciones.append(partes[0])
+		else:
+			condiciones.append(f"and({','.join(partes)})")
+	return ",".join(condiciones)
+
+
+def _fetch_keyset(client: Client, table_name: str, batch_size: int, select: str = "*", formato: str = "json") -> list:
+	"""
+	Descarga la tabla paginando por clave primaria (keyset / cursor):
+	cada página continúa desde la última clave vista en lugar de usar OFFSET,
+	así el costo de cada página no crece con la posición en la tabla.
+	Termina con la primera página vacía. Si una página falla se reintenta
+	desde esa misma clave.
+	"""
+	key_cols = TABLE_KEYS.get(table_name)
+	if not key_cols:
+		return _fetch_offset(client, table_name, batch_size, select, formato=formato)
+
+	paginas = []
+	last_row = None
+	while True:
+		query = client.table(table_name).select(select)
+		if last_row is not None:
+			if len(key_cols) == 1:
+				query = query.gt(key_cols[0], last_row[key_cols[0]])
+			else:
+				query = query.or_(_filtro_keyset(key_cols, last_row))
+		query = _ordenar_por_clave(query, table_name).limit(batch_size)
+		batch = _ejecutar_pagina(query, table_name, formato)
+		if len(batch) == 0:
+			break
+		# Sin cortar ante una página corta: si el max-rows de PostgREST es
+		# menor que batch_size, todas las páginas llegan cortas
+		paginas.append(batch)
+		last_row = batch.iloc[-1].to_dict()
+	return paginas
+
+
+def fetch_all(table_name: str, batch_size: int = 1000, mode: str = None, columns: list = None, filtro: str = None, client: Client = None, formato: str = None) -> pd.DataFrame:
 	"""
 	Obtiene todos los registros de una tabla.
 	Respeta las políticas RLS de Supabase:
 	- Si el usuario está autenticado, aplica políticas para usuarios autenticados
 	- Si es anónimo, aplica políticas para usuarios anónimos
+	
+	Args:
+		table_name: Nombre de la tabla
+		batch_size: Filas por página
+		mode: "offset" (páginas secuenciales), "parallel" (cuenta las filas
+			y pide todas las páginas a la vez) o "keyset" (pagina por clave
+			primaria, sin OFFSET). Por defecto se usa FETCH_MODES.
+		columns: Columnas a descargar (None = todas). Siempre se incluye
+			la clave primaria de la tabla.
+		filtro: Filtro OR de PostgREST, ej: 'GAME_ID.gt."0022300500"'.
+			Con filtro, el modo keyset se reemplaza por offset (el cursor
+			ya usa su propio filtro OR).
+		client: Cliente a usar (por defecto el de la sesión actual). Los
+			hilos en segundo plano deben pasarlo porque no tienen sesión.
+		formato: "json" o "csv" (cada página llega como text/csv y se lee
+			con pd.read_csv, sin decodificar JSON ni armar un dict por
+			fila). Por defecto se usa FETCH_FORMATS.
+	
+	Raises:
+		ErrorDescarga: si alguna página no se pudo descargar. Nunca se
+			devuelve una tabla truncada.
 	"""
-	client = get_supabase_client()
-	all_rows = []
-	start = 0
-	while True:
+	client = client or get_supabase_client()
+	mode = mode or FETCH_MODES.get(table_name, "offset")
+	formato = formato or FETCH_FORMATS.get(table_name, "json")
+	if filtro and mode == "keyset":
+		mode = "offset"
+	select = "*"
+	if columns:
+		key_cols = [c for c in TABLE_KEYS.get(table_name, []) if c not in columns]
+		select = ",".join(key_cols + list(columns))
+
+	if mode == "parallel":
+		paginas = _fetch_parallel(client, table_name, batch_size, FETCH_MAX_WORKERS, select, filtro, formato)
+	elif mode == "keyset":
+		paginas = _fetch_keyset(client, table_name, batch_size, select, formato)
+	elif mode == "offset":
+		paginas = _fetch_offset(client, table_name, batch_size, select, filtro, formato)
+	else:
+		raise ValueError(f"Modo de descarga desconocido: {mode}")
+	return _juntar_paginas(paginas)
+
+
+# ==============================================================
+# 🗄️ FUENTES DE DATOS
+# ==============================================================
+
+# De dónde se leen las tablas: "supabase" (por defecto) o "local" (archivos
+# de DATA_DIR, por ejemplo los CSV que genera el ETL en datos/). Se configuran
+# en secrets.toml o con variables de entorno del mismo nombre. Las escrituras
+# (admin) van siempre a Supabase.
+DATA_DIR_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+
+# Nombre del archivo de cada tabla en DATA_DIR (sin extensión), si no coincide
+LOCAL_FILES = {
+	"partidos": "partido",
+}
+
+
+def _config(nombre: str, defecto: str = None) -> str:
+	"""Valor de configuración: variable de entorno o st.secrets (o defecto)."""
+	if os.environ.get(nombre):
+		return os.environ[nombre]
+	try:
+		return st.secrets.get(nombre, defecto)
+	except Exception:
+		return defecto
+
+
+def _config_valor(nombre: str, defecto):
+	"""
+	Como _config, pero convierte el texto de las variables de entorno:
+	"none" → None, "true"/"false" → bool y números → int o float.
+	En secrets.toml los valores ya vienen con su tipo.
+	"""
+	valor = _config(nombre, defecto)
+	if not isinstance(valor, str):
+		return valor
+	texto = valor.strip().lower()
+	if texto in ("none", "null", ""):
+		return None
+	if texto in ("true", "false", "1", "0") and isinstance(defecto, bool):
+		return texto in ("true", "1")
+	try:
+		return int(texto)
+	except ValueError:
+		return float(texto)
+
+
+class DataSource(ABC):
+	"""
+	Origen de lectura de las tablas. Cada implementación sabe:
+	- leer(): descargar una tabla completa, una proyección o solo algunas
+	  particiones (sincronización incremental de DELTA_TABLES)
+	- sello(): el sello de versión de una tabla (filas, marca de agua)
+	remota indica si vale la pena guardar un snapshot en disco de lo leído.
+	"""
+
+	remota = True
+
+	@abstractmethod
+	def leer(self, table_name: str, columns: list = None, client: Client = None, desde: str = None, particiones: set = None) -> pd.DataFrame:
+		"""
+		Args:
+			table_name: Nombre de la tabla
+			columns: Columnas a leer (None = todas); la clave se incluye siempre
+			client: Cliente de Supabase (solo lo usan las fuentes remotas)
+			desde: Solo filas con partición mayor a esta marca de agua
+			particiones: Además, las filas de estas particiones
+		
+		Raises:
+			ErrorDescarga: si la tabla no se pudo leer completa
+		"""
+
+	@abstractmethod
+	def sello(self, table_name: str, client: Client = None) -> dict:
+		"""Sello de versión de la tabla: {"filas": ..., "marca": ...}."""
+
+
+class SupabaseSource(DataSource):
+	"""Lee las tablas de Supabase (PostgREST), respetando RLS."""
+
+	def leer(self, table_name, columns=None, client=None, desde=None, particiones=None):
+		part_col = DELTA_TABLES.get(table_name)
+		condiciones = []
+		if desde is not None:
+			condiciones.append(f'{part_col}.gt."{desde}"')
+		if particiones:
+			valores = ",".join(f'"{v}"' for v in sorted(particiones))
+			condiciones.append(f"{part_col}.in.({valores})")
+		return fetch_all(table_name, columns=columns, filtro=",".join(condiciones) or None, client=client)
+
+	def sello(self, table_name, client=None):
+		return _sello_servidor(client or get_supabase_client(), table_name)
+
+
+class LocalSource(DataSource):
+	"""
+	Lee las tablas de archivos en un directorio: <tabla>.parquet si existe,
+	si no <tabla>.csv (el formato del ETL). Sin red ni credenciales: sirve
+	para réplicas de solo lectura, pruebas y benchmarks.
+	"""
+
+	remota = False
+
+	def __init__(self, directorio: str):
+		self.directorio = directorio
+
+	def _ruta(self, table_name: str, extension: str) -> str:
+		return os.path.join(self.directorio, f"{LOCAL_FILES.get(table_name, table_name)}.{extension}")
+
+	def leer(self, table_name, columns=None, client=None, desde=None, particiones=None):
+		cols = None
+		if columns:
+			cols = [c for c in TABLE_KEYS.get(table_name, []) if c not in columns] + list(columns)
 		try:
-			batch = (
-				client.table(table_name)
-				.select("*")
-				.range(start, start + batch_size - 1)
-				.execute()
-				.data
-			)
-			if not batch:
-				break
-			all_rows.extend(batch)
-			start += batch_size
+			if os.path.exists(self._ruta(table_name, "parquet")):
+				df = pd.read_parquet(self._ruta(table_name, "parquet"), columns=cols)
+			elif os.path.exists(self._ruta(table_name, "csv")):
+				# utf-8-sig: el ETL escribe algunos CSV con BOM
+				df = pd.read_csv(
+					self._ruta(table_name, "csv"),
+					usecols=cols,
+					dtype={col: str for col in CSV_TEXT_COLUMNS},
+					encoding="utf-8-sig",
+				)
+			else:
+				raise ErrorDescarga(f"No existe el archivo de {table_name} en {self.directorio}")
+		except ErrorDescarga:
+			raise
 		except Exception as e:
-			# Si hay error, probablemente por RLS o permisos
-			st.warning(f"⚠️ Error al acceder a {table_name}: {str(e)}")
-			break
-	return pd.DataFrame(all_rows)
+			# Columnas pedidas que no están en el archivo, archivo corrupto, etc.:
+			# como un error de descarga, así load_table usa el respaldo
+			raise ErrorDescarga(f"No se pudo leer {table_name} de {self.directorio}: {e}") from e
+
+		part_col = DELTA_TABLES.get(table_name)
+		if part_col and (desde is not None or particiones):
+			valores = df[part_col].astype(str)
+			filtro = valores.isin([str(v) for v in particiones or ()])
+			if desde is not None:
+				filtro |= valores > str(desde)
+			df = df[filtro].reset_index(drop=True)
+		return _compactar_numericas(table_name, df)
+
+	def sello(self, table_name, client=None):
+		part_col = DELTA_TABLES.get(table_name)
+		cols = [part_col] if part_col else [TABLE_KEYS[table_name][0]]
+		df = self.leer(table_name, cols)
+		return {"filas": int(len(df)), "marca": _marca_de(table_name, df)}
+
+
+@st.cache_resource
+def get_data_source() -> DataSource:
+	"""
+	Fuente de datos configurada (DATA_SOURCE y DATA_DIR), una por proceso.
+
+	Raises:
+		ValueError: si DATA_SOURCE no es "supabase" ni "local"
+	"""
+	tipo = _config("DATA_SOURCE", "supabase")
+	if tipo == "supabase":
+		return SupabaseSource()
+	if tipo == "local":
+		return LocalSource(_config("DATA_DIR", DATA_DIR_DEFAULT))
+	raise ValueError(f"DATA_SOURCE desconocido: {tipo}")
 
 
-def get_cache_key() -> str:
+# Ámbito del cache compartido por todos los usuarios
+PUBLIC_SCOPE = "public"
+
+# Tablas cuyas políticas RLS devuelven filas distintas según el rol.
+# Solo estas se cachean por rol ("anon" / "authenticated"); el resto se lee
+# una sola vez con el cliente anónimo y se comparte entre todos los usuarios.
+RLS_OVERLAY_TABLES = set()
+
+
+def get_cache_key(table_name: str = None) -> str:
 	"""
-	Genera una clave única para el cache basada en el estado de autenticación.
-	Esto permite tener caches separados para usuarios anónimos y autenticados.
+	Devuelve el ámbito de cache de una tabla para la sesión actual.
+	- Tablas públicas: PUBLIC_SCOPE, una sola copia para todos los usuarios
+	- Tablas de RLS_OVERLAY_TABLES: "authenticated" o "anon" según la sesión
+	  (una copia por rol, no por usuario)
 	"""
+	if table_name is not None and table_name not in RLS_OVERLAY_TABLES:
+		return PUBLIC_SCOPE
 	init_session_state()
 	if check_auth():
-		user = get_current_user()
-		if user:
-			return f"auth_{user.id}"
+		return "authenticated"
 	return "anon"
 
 
-@st.cache_data()  # Cache persistente hasta que se limpie manualmente
-def _load_data_cached(cache_key: str):
+def _cliente_para(cache_key: str) -> Client:
+	"""Cliente con el que se llenan las entradas de un ámbito de cache."""
+	if cache_key == PUBLIC_SCOPE:
+		return get_supabase_anon()
+	return get_supabase_client()
+
+
+# Tablas que devuelve load_data(), en orden
+TABLAS = ("partidos", "partidos_futuros", "boxscores", "equipos", "jugadores")
+
+# Columnas calculadas en el cliente y las columnas del servidor de las que salen
+DERIVED_COLUMNS = {
+	"jugadores": {"PLAYER_NAME": ["FIRST_NAME", "LAST_NAME"]},
+}
+
+
+def _columnas_servidor(table_name: str, columns: tuple) -> list:
+	"""Traduce las columnas pedidas a columnas reales de la tabla en Supabase."""
+	derivadas = DERIVED_COLUMNS.get(table_name, {})
+	result = []
+	for col in columns:
+		for real in derivadas.get(col, [col]):
+			if real not in result:
+				result.append(real)
+	return result
+
+
+# Tipos compactos de cada tabla, aplicados una sola vez al cargar.
+# - category: textos muy repetidos (equipos, posiciones, nombres en boxscores)
+# - int32 / int16: IDs y estadísticas; si la columna trae nulos o decimales
+#   queda en float (float32 las estadísticas, float64 los IDs)
+# - datetime: fechas ya parseadas, las páginas no necesitan pd.to_datetime
+# GAME_ID queda como texto: en Supabase es una columna de texto con ceros a la
+# izquierda y las consultas, la marca de agua y los filtros se arman con él.
+_STATS_BOXSCORE = ("PTS", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA",
+	"REB", "AST", "STL", "BLK", "TOV", "PF")
+
+SCHEMA = {
+	"partidos": {
+		"FECHA": "datetime", "LOCAL": "category", "VISITANTE": "category",
+		"PTS_LOCAL": "int16", "PTS_VISITANTE": "int16",
+	},
+	"partidos_futuros": {
+		"FECHA": "datetime", "LOCAL": "category", "VISITANTE": "category",
+	},
+	"boxscores": {
+		"TEAM_ABBREVIATION": "category", "PLAYER_ID": "int32",
+		"PLAYER_NAME": "category", "MIN": "float32",
+		**{col: "int16" for col in _STATS_BOXSCORE},
+	},
+	"equipos": {
+		"CONFERENCE": "category", "DIVISION": "category",
+	},
+	"jugadores": {
+		"PLAYER_ID": "int32", "POSITION": "category", "TEAM_ABBREVIATION": "category",
+		"WEIGHT": "int16", "AGE": "int16",
+	},
+}
+
+
+def _compactar_columna(serie: pd.Series, tipo: str) -> pd.Series:
+	"""
+	Convierte una columna al tipo del SCHEMA.
+	Si la conversión perdería información (textos no numéricos, valores fuera
+	de rango) la columna se deja como está.
+	"""
+	if tipo == "category":
+		return serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype("category")
+	if tipo == "datetime":
+		return pd.to_datetime(serie, errors="coerce")
+
+	numeros = pd.to_numeric(serie, errors="coerce")
+	if (numeros.isna() & serie.notna()).any():
+		return serie
+	if tipo == "float32":
+		return numeros.astype("float32")
+
+	limites = np.iinfo(tipo)
+	# float32 representa exacto solo enteros de hasta 7 dígitos (IDs -> float64)
+	con_decimales = "float32" if limites.max <= np.iinfo("int16").max else "float64"
+	sin_nulos = numeros.dropna()
+	if sin_nulos.empty:
+		return numeros.astype(con_decimales) if numeros.isna().any() else numeros.astype(tipo)
+	if sin_nulos.min() < limites.min or sin_nulos.max() > limites.max:
+		return numeros
+	if numeros.isna().any() or (sin_nulos % 1 != 0).any():
+		return numeros.astype(con_decimales)
+	return numeros.astype(tipo)
+
+
+def clave_partido(game_id) -> int:
+	"""
+	Clave canónica de un partido: el GAME_ID como entero, así
+	"0022300061", "22300061" y 22300061 apuntan al mismo partido.
+	
+	Returns:
+		int: Clave del partido, o None si el GAME_ID no es numérico
+	"""
+	try:
+		return int(str(game_id).strip())
+	except (TypeError, ValueError):
+		return None
+
+
+def clave_jugador(player_id) -> int:
+	"""Clave canónica de un jugador: el PLAYER_ID como entero (o None)."""
+	return clave_partido(player_id)
+
+
+def clave_equipo(team_abbr) -> str:
+	"""Clave canónica de un equipo: la abreviatura en mayúsculas (o None)."""
+	if team_abbr is None or pd.isna(team_abbr):
+		return None
+	return str(team_abbr).strip().upper()
+
+
+# Columna con la clave canónica de cada entidad y su función de normalización.
+# GAME_KEY se agrega al cargar las tablas que tienen GAME_ID.
+CLAVES = {
+	"GAME_KEY": clave_partido,
+	"PLAYER_ID": clave_jugador,
+	"TEAM_ABBREVIATION": clave_equipo,
+}
+
+
+def _compactar_numericas(table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+	"""
+	Aplica solo los tipos numéricos del SCHEMA. Se usa en cada página durante
+	la descarga; categorías y fechas se aplican una vez sobre la tabla entera
+	(concatenar categorías distintas las volvería a convertir en texto).
+	"""
+	for col, tipo in SCHEMA.get(table_name, {}).items():
+		if col in df.columns and tipo not in ("category", "datetime"):
+			df[col] = _compactar_columna(df[col], tipo)
+	return df
+
+
+def _aplicar_schema(table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+	"""Aplica los tipos compactos del SCHEMA y agrega las claves canónicas."""
+	for col, tipo in SCHEMA.get(table_name, {}).items():
+		if col in df.columns:
+			df[col] = _compactar_columna(df[col], tipo)
+	if "GAME_ID" in df.columns:
+		game_key = pd.to_numeric(df["GAME_ID"], errors="coerce")
+		df["GAME_KEY"] = game_key.astype("Int32" if game_key.isna().any() else "int32")
+	return df
+
+
+def _preparar_tabla(table_name: str, df: pd.DataFrame, columns: tuple = None) -> pd.DataFrame:
+	"""Agrega las columnas calculadas, aplica los tipos y recorta la proyección pedida."""
+	if table_name == "jugadores" and (columns is None or "PLAYER_NAME" in columns):
+		# Crear columna PLAYER_NAME si hace falta
+		if "FIRST_NAME" in df.columns and "LAST_NAME" in df.columns:
+			df["PLAYER_NAME"] = (
+				df["FIRST_NAME"].astype(str) + " " + df["LAST_NAME"].astype(str)
+			)
+		elif "PLAYER_NAME" not in df.columns:
+			df["PLAYER_NAME"] = ""
+
+	if columns is not None:
+		keep = [c for c in TABLE_KEYS.get(table_name, []) if c not in columns] + list(columns)
+		df = df[[c for c in keep if c in df.columns]]
+	return _aplicar_schema(table_name, df)
+
+
+# Tablas con sincronización incremental y su columna de partición.
+# La partición también sirve de marca de agua: los GAME_ID tienen ancho fijo,
+# así que el orden de texto coincide con el orden numérico.
+DELTA_TABLES = {
+	"partidos": "GAME_ID",
+	"partidos_futuros": "GAME_ID",
+	"boxscores": "GAME_ID",
+}
+
+
+# Las tres opciones del cache se pueden cambiar en secrets.toml o con
+# variables de entorno del mismo nombre (ver _config_valor).
+
+# True: load_table devuelve vistas de solo lectura de los DataFrames cacheados
+# (sin copiar datos). False: devuelve copias completas, como st.cache_data.
+CACHE_ZERO_COPY = _config_valor("CACHE_ZERO_COPY", True)
+
+# Stale-while-revalidate: pasados CACHE_TTL segundos desde la última carga,
+# load_table sigue devolviendo al instante lo cacheado y refresca la tabla en
+# un hilo de fondo. None = sin vencimiento (solo se recarga al escribir).
+CACHE_TTL = _config_valor("CACHE_TTL", 300)
+
+# Presupuesto de memoria del cache (bytes): tablas con sus índices, resultados
+# de query() y de calculo_derivado. Al pasarse se desalojan primero los
+# resultados de query(), después los de calculo_derivado y por último las
+# tablas usadas hace más tiempo (LRU). None = sin límite.
+CACHE_MAX_BYTES = _config_valor("CACHE_MAX_BYTES", 512 * 1024 * 1024)
+
+
+@st.cache_resource
+def _get_store() -> dict:
+	"""
+	Cache de tablas compartido por todo el proceso.
+	Cada entrada (cache_key, tabla, columnas) guarda:
+	- df: el DataFrame cargado
+	- marca: mayor valor de la partición visto (solo tablas de DELTA_TABLES)
+	- pendientes: particiones modificadas desde la última sincronización
+	- cargado: momento (time.monotonic) de la última carga o revalidación
+	- bytes: memoria que ocupan el DataFrame y sus índices (ver cache_stats)
+	- version: versión de la tabla al guardarla (ver _guardar_snapshot)
+	"tablas" está ordenado de la entrada usada hace más tiempo a la más reciente.
+	En "vuelos" están las cargas en curso, una por entrada (ver _obtener_entrada).
+	En "consultas" están los resultados de query(), de la menos a la más usada.
+	En "versiones" está la versión de los datos de cada tabla (ver version_tabla).
+	En "derivadas" están los resultados de calculo_derivado, por versión y
+	de los menos a los más usados.
+	"""
+	return {
+		"lock": threading.RLock(), "tablas": OrderedDict(), "vuelos": {},
+		"consultas": OrderedDict(), "versiones": {}, "derivadas": OrderedDict(),
+	}
+
+
+def _medir_entrada(entry: dict) -> dict:
+	"""Anota en la entrada la memoria que ocupa su DataFrame."""
+	if "bytes" not in entry:
+		entry["bytes"] = int(entry["df"].memory_usage(deep=True).sum())
+	return entry
+
+
+def _medir_valor(valor) -> int:
+	"""
+	Memoria aproximada de un valor guardado (resultado de calculo_derivado
+	o índice de _indice): DataFrames, arrays y dict / tuplas / listas de
+	ellos o de escalares.
+	"""
+	if isinstance(valor, (pd.DataFrame, pd.Series)):
+		return int(valor.memory_usage(deep=True).sum())
+	if isinstance(valor, np.ndarray):
+		return int(valor.nbytes) + sys.getsizeof(valor[:0])
+	if isinstance(valor, dict):
+		return sys.getsizeof(valor) + sum(sys.getsizeof(k) + _medir_valor(v) for k, v in valor.items())
+	if isinstance(valor, (tuple, list, set)):
+		return sys.getsizeof(valor) + sum(_medir_valor(v) for v in valor)
+	return sys.getsizeof(valor)
+
+
+def _liberar_memoria(store: dict, key: tuple = None):
+	"""
+	Si el cache se pasa de CACHE_MAX_BYTES, desaloja primero los resultados
+	de query() (se recalculan desde las tablas), después los de
+	calculo_derivado y por último las tablas, de los menos a los más usados.
+	Nunca desaloja la entrada key recién guardada ni las tablas con
+	particiones pendientes (se perderían esas escrituras). Llamar con
+	store["lock"] tomado.
+	"""
+	if CACHE_MAX_BYTES is None:
+		return
+	grupos = (store["consultas"], store["derivadas"], store["tablas"])
+	total = sum(e["bytes"] for grupo in grupos for e in grupo.values())
+	for grupo in grupos:
+		for vieja in list(grupo):
+			if total <= CACHE_MAX_BYTES:
+				return
+			if vieja == key or grupo[vieja].get("pendientes"):
+				continue
+			total -= grupo.pop(vieja)["bytes"]
+
+
+def _guardar_entrada(store: dict, key: tuple, entry: dict):
+	"""
+	Guarda una entrada como la usada más recientemente y respeta
+	CACHE_MAX_BYTES (ver _liberar_memoria).
+	Llamar con store["lock"] tomado y la entrada ya medida (_medir_entrada).
+	"""
+	tablas = store["tablas"]
+	# Versión de la tabla con la que se guardó (ordena las escrituras del snapshot)
+	entry["version"] = store["versiones"].get(key[1], 0)
+	tablas[key] = entry
+	tablas.move_to_end(key)
+	_liberar_memoria(store, key)
+
+
+def cache_stats() -> pd.DataFrame:
+	"""
+	Memoria que ocupa cada entrada del cache de tablas (con sus índices),
+	cada resultado guardado de query() (alcance "query", con la consulta en
+	"columnas") y de calculo_derivado (alcance "derivado", con su nombre en
+	"columnas").
+	
+	Returns:
+		pd.DataFrame: Una fila por entrada (tablas, consultas y derivados,
+			cada grupo de la menos a la más usada recientemente) con alcance,
+			tabla, columnas, filas, MB, edad en segundos y particiones
+			pendientes
+	"""
+	store = _get_store()
+	with store["lock"]:
+		items = list(store["tablas"].items())
+		consultas = list(store["consultas"].items())
+		derivadas = list(store["derivadas"].items())
+	ahora = time.monotonic()
+	filas = [
+		{
+			"alcance": cache_key,
+			"tabla": table_name,
+			"columnas": "todas" if columns is None else ", ".join(columns),
+			"filas": len(entry["df"]),
+			"MB": round(entry["bytes"] / 1024 ** 2, 2),
+			"edad_s": int(ahora - entry.get("cargado", ahora)),
+			"pendientes": len(entry["pendientes"]),
+		}
+		for (cache_key, table_name, columns), entry in items
+	]
+	filas += [
+		{
+			"alcance": "query",
+			"tabla": ", ".join(t for t, _ in resultado["version"]),
+			"columnas": sql,
+			"filas": len(resultado["df"]),
+			"MB": round(resultado["bytes"] / 1024 ** 2, 2),
+			"edad_s": int(ahora - resultado.get("cargado", ahora)),
+			"pendientes": 0,
+		}
+		for (sql, _), resultado in consultas
+	]
+	filas += [
+		{
+			"alcance": "derivado",
+			"tabla": ", ".join(sorted(guardado["tablas"])),
+			"columnas": nombre,
+			"filas": len(guardado["valor"]) if isinstance(guardado["valor"], pd.DataFrame) else None,
+			"MB": round(guardado["bytes"] / 1024 ** 2, 2),
+			"edad_s": int(ahora - guardado.get("cargado", ahora)),
+			"pendientes": 0,
+		}
+		for nombre, guardado in derivadas
+	]
+	return pd.DataFrame(
+		filas,
+		columns=["alcance", "tabla", "columnas", "filas", "MB", "edad_s", "pendientes"],
+	)
+
+
+def _entregar(entry: dict) -> pd.DataFrame:
+	"""
+	Devuelve el DataFrame de una entrada del cache a una página.
+	Con CACHE_ZERO_COPY se entrega una vista que comparte los datos del cache:
+	gracias a Copy-on-Write, asignar columnas o valores en la vista nunca
+	modifica el DataFrame compartido, y .values / .to_numpy() devuelven
+	arrays de solo lectura.
+	"""
+	if CACHE_ZERO_COPY:
+		return entry["df"].copy(deep=False)
+	return entry["df"].copy()
+
+
+def _fetch_tabla(table_name: str, columns: tuple = None, client: Client = None, desde: str = None, particiones: set = None) -> pd.DataFrame:
+	"""Lee una tabla (o proyección) de la fuente de datos y le agrega las columnas calculadas."""
+	server_cols = _columnas_servidor(table_name, columns) if columns is not None else None
+	df = get_data_source().leer(table_name, server_cols, client, desde, particiones)
+	return _preparar_tabla(table_name, df, columns)
+
+
+def _marca_de(table_name: str, df: pd.DataFrame):
+	"""Mayor valor de la columna de partición (marca de agua) o None."""
+	part_col = DELTA_TABLES.get(table_name)
+	if part_col and part_col in df.columns and not df.empty:
+		return df[part_col].astype(str).max()
+	return None
+
+
+def _nueva_entrada(table_name: str, columns: tuple = None, client: Client = None) -> dict:
+	"""Carga completa de una tabla para el cache."""
+	df = _fetch_tabla(table_name, columns, client=client)
+	return {"df": df, "marca": _marca_de(table_name, df), "pendientes": set(), "cargado": time.monotonic()}
+
+
+def _sincronizar_entrada(entry: dict, table_name: str, columns: tuple = None, client: Client = None) -> dict:
+	"""
+	Sincronización incremental: pide solo las filas de particiones nuevas
+	(por encima de la marca de agua) o modificadas desde la última carga,
+	y las reemplaza en el DataFrame cacheado. Las particiones pendientes que
+	ya no existen en el servidor quedan eliminadas (así se propagan los borrados).
+	"""
+	part_col = DELTA_TABLES[table_name]
+	pendientes = set(entry["pendientes"])
+	if entry["marca"] is None and not pendientes:
+		return _nueva_entrada(table_name, columns, client)
+
+	delta = _fetch_tabla(table_name, columns, client, desde=entry["marca"], particiones=pendientes)
+
+	df = entry["df"]
+	reemplazar = pendientes
+	if not delta.empty:
+		reemplazar = reemplazar | set(delta[part_col].astype(str))
+	if not df.empty and reemplazar:
+		df = df[~df[part_col].astype(str).isin(reemplazar)]
+	if not delta.empty:
+		# concat de categorías distintas da object: se vuelven a compactar
+		df = _aplicar_schema(table_name, pd.concat([df, delta], ignore_index=True))
+	df = df.reset_index(drop=True)
+
+	marca = entry["marca"]
+	if not delta.empty:
+		marca = max(filter(None, [marca, delta[part_col].astype(str).max()]))
+	return {"df": df, "marca": marca, "pendientes": entry["pendientes"] - pendientes, "cargado": time.monotonic()}
+
+
+def version_tabla(table_name: str) -> int:
+	"""
+	Versión de los datos de una tabla: un contador del proceso que sube con
+	cada escritura (invalidar_tablas) y con cada refresco que trae datos
+	distintos del servidor. Los caches de resultados calculados a partir de
+	una tabla deben usarla como clave (ver versiones).
+	"""
+	store = _get_store()
+	with store["lock"]:
+		return store["versiones"].get(table_name, 0)
+
+
+def versiones(tablas=TABLAS) -> tuple:
 	"""
-	Función interna que carga los datos con cache.
-	El parámetro cache_key asegura que usuarios anónimos y autenticados
-	tengan caches separados.
+	Versiones de varias tablas, para usar como clave de un cache derivado:
+	el resultado guardado vale mientras no cambie ninguna de esas tablas.
+	
+	Returns:
+		tuple: ((tabla, versión), ...) en el orden recibido
 	"""
-	partidos = fetch_all("partidos")
-	partidos_futuros = fetch_all("partidos_futuros")
-	boxscores = fetch_all("boxscores")
-	equipos = fetch_all("equipos")
-	jugadores = fetch_all("jugadores")
+	store = _get_store()
+	with store["lock"]:
+		return tuple((t, store["versiones"].get(t, 0)) for t in tablas)
 
-	# Crear columna PLAYER_NAME si hace falta
-	if "FIRST_NAME" in jugadores.columns and "LAST_NAME" in jugadores.columns:
-		jugadores["PLAYER_NAME"] = (
-			jugadores["FIRST_NAME"].astype(str) + " " + jugadores["LAST_NAME"].astype(str)
+
+def calculo_derivado(nombre: str, tablas: tuple, calcular):
+	"""
+	Resultado calculado a partir de tablas del cache, compartido por todas
+	las sesiones y guardado por versión de los datos (ver versiones): se
+	recalcula solo cuando cambia alguna de sus tablas. Las escrituras y los
+	refrescos lo descartan al subir la versión (ver invalidar_derivados).
+	El valor se comparte entre sesiones, así que se entrega protegido (ver
+	_solo_lectura). Ejemplo:
+		modelo = calculo_derivado(
+			"promedios_equipos", ("partidos", "boxscores"),
+			lambda partidos, boxscores: precalcular(partidos, boxscores),
 		)
-	elif "PLAYER_NAME" not in jugadores.columns:
-		jugadores["PLAYER_NAME"] = ""
+	
+	Args:
+		nombre: Nombre único del resultado
+		tablas: Tablas de las que depende
+		calcular: Función que recibe los DataFrames de esas tablas, en orden
+	
+	Returns:
+		El valor de calcular(), recién calculado o guardado
+	"""
+	# Igual que en query(): la versión se toma antes de leer
+	version = versiones(tablas)
+	store = _get_store()
+	with store["lock"]:
+		guardado = store["derivadas"].get(nombre)
+		if guardado is not None and guardado["version"] == version:
+			store["derivadas"].move_to_end(nombre)
+			return _solo_lectura(guardado["valor"])
+
+	entries = [_obtener_entrada(table_name) for table_name in tablas]
+	valor = calcular(*(entry["df"] for entry in entries))
+	# Datos anteriores o vacíos por un error de descarga: no se guarda
+	if any(entry["pendientes"] or entry.get("respaldo") for entry in entries):
+		return valor
+
+	# Cuenta en CACHE_MAX_BYTES junto con las tablas (ver _liberar_memoria)
+	guardado = {
+		"valor": valor, "version": version, "tablas": set(tablas),
+		"bytes": _medir_valor(valor), "cargado": time.monotonic(),
+	}
+	with store["lock"]:
+		if versiones(tablas) == version:
+			store["derivadas"][nombre] = guardado
+			store["derivadas"].move_to_end(nombre)
+			_liberar_memoria(store)
+	return _solo_lectura(valor)
+
+
+def _solo_lectura(valor):
+	"""
+	Vista protegida de un valor compartido de calculo_derivado: los
+	DataFrames se entregan como en _entregar (vista con Copy-on-Write o
+	copia), los dict como MappingProxyType y las tuplas y listas como
+	tuplas, recursivamente. Otros valores se devuelven tal cual.
+	"""
+	if isinstance(valor, pd.DataFrame):
+		return _entregar({"df": valor})
+	if isinstance(valor, dict):
+		return MappingProxyType({k: _solo_lectura(v) for k, v in valor.items()})
+	if isinstance(valor, (tuple, list)):
+		return tuple(_solo_lectura(v) for v in valor)
+	return valor
+
+
+def invalidar_derivados(tablas=TABLAS):
+	"""
+	Descarta los resultados de calculo_derivado que dependen de alguna de
+	las tablas (los demás quedan). _subir_version lo llama en cada cambio
+	de datos, así que las escrituras del admin no necesitan llamarlo aparte.
+	
+	Args:
+		tablas: Tablas modificadas
+	"""
+	store = _get_store()
+	with store["lock"]:
+		derivados = store["derivadas"]
+		for nombre in [n for n, d in derivados.items() if d["tablas"] & set(tablas)]:
+			del derivados[nombre]
+
+
+def _subir_version(store: dict, tablas):
+	"""
+	Sube la versión de las tablas y descarta los resultados derivados de
+	ellas. Llamar con store["lock"] tomado.
+	"""
+	for table_name in tablas:
+		store["versiones"][table_name] = store["versiones"].get(table_name, 0) + 1
+	invalidar_derivados(tablas)
+
+
+def _registrar_cambio(table_name: str, valores: list):
+	"""
+	Marca particiones (GAME_ID) modificadas por una escritura. La próxima
+	lectura de la tabla las vuelve a pedir en una sola consulta pequeña
+	en lugar de descargar la tabla completa.
+	"""
+	store = _get_store()
+	with store["lock"]:
+		for (_, tabla, _), entry in store["tablas"].items():
+			if tabla == table_name:
+				entry["pendientes"].update(str(v) for v in valores)
+		# Las cargas en curso pueden haber leído antes de la escritura
+		for (_, tabla, _), vuelo in store["vuelos"].items():
+			if tabla == table_name:
+				vuelo["pendientes"].update(str(v) for v in valores)
+		_subir_version(store, [table_name])
+	# Si la entrada completa no está en memoria (desalojada), el snapshot en
+	# disco ya no refleja la tabla: se descarta hasta la próxima carga
+	_descartar_snapshot([table_name])
+
+
+def invalidar_tablas(tablas: list, particiones: list = None):
+	"""
+	Invalida solo las tablas tocadas por una escritura y sube su versión;
+	el resto del cache (por ejemplo equipos) queda intacto.
+	- Tablas de DELTA_TABLES con particiones (GAME_ID): se marcan esas
+	  particiones y la próxima lectura pide solo ellas
+	- Resto: se descartan las entradas de la tabla (todas sus proyecciones
+	  y ámbitos) y se recarga completa en la próxima lectura
+	
+	Args:
+		tablas: Tablas modificadas, ej: ["jugadores"]
+		particiones: GAME_ID afectados (solo para tablas de DELTA_TABLES)
+	"""
+	descartar = []
+	for table_name in tablas:
+		if particiones is not None and table_name in DELTA_TABLES:
+			_registrar_cambio(table_name, particiones)
+		else:
+			descartar.append(table_name)
+	if not descartar:
+		return
+
+	store = _get_store()
+	with store["lock"]:
+		for key in [k for k in store["tablas"] if k[1] in descartar]:
+			del store["tablas"][key]
+		# Una carga en curso puede haber leído antes de la escritura
+		for key, vuelo in store["vuelos"].items():
+			if key[1] in descartar:
+				vuelo["valido"] = False
+		_subir_version(store, descartar)
+	_descartar_snapshot(descartar)
+
+
+def _claves_de(table_name: str, df: pd.DataFrame) -> pd.Index:
+	"""Clave primaria de cada fila (como texto), para cruzar filas del cache con filas de Supabase."""
+	cols = TABLE_KEYS[table_name]
+	if len(cols) == 1:
+		return pd.Index(df[cols[0]].astype(str))
+	return pd.MultiIndex.from_arrays([df[c].astype(str) for c in cols])
+
+
+def _parchear_df(table_name: str, df: pd.DataFrame, columns: tuple, filas: list, borradas: list) -> pd.DataFrame:
+	"""Reemplaza/agrega las filas escritas y quita las borradas de un DataFrame cacheado."""
+	quitar = []
+	nuevas = None
+	if filas:
+		nuevas = _preparar_tabla(table_name, pd.DataFrame(filas), columns)
+		quitar.extend(_claves_de(table_name, nuevas))
+	if borradas:
+		claves = pd.DataFrame(borradas)[TABLE_KEYS[table_name]]
+		quitar.extend(_claves_de(table_name, _aplicar_schema(table_name, claves)))
+	if quitar and not df.empty:
+		df = df[~_claves_de(table_name, df).isin(quitar)]
+	if nuevas is not None and not nuevas.empty:
+		# concat de categorías distintas da object: se vuelven a compactar
+		df = _aplicar_schema(table_name, pd.concat([df, nuevas], ignore_index=True))
+	return df.reset_index(drop=True)
+
+
+def _parchear_tabla(table_name: str, filas: list = None, borradas: list = None):
+	"""
+	Write-through: aplica en las entradas cacheadas de la tabla las filas que
+	devolvió una escritura, sin volver a descargar nada, y sube la versión
+	de la tabla (lectura inmediata de lo escrito). Si la tabla tiene RLS
+	distinto por rol, o el parche falla, se cae a invalidar_tablas()
+	(sincronización o recarga en la próxima lectura).
+	
+	Args:
+		table_name: Tabla escrita
+		filas: Filas insertadas o actualizadas (response.data de insert/update)
+		borradas: Filas eliminadas (response.data de delete)
+	"""
+	if not filas and not borradas:
+		return
+	particiones = None
+	part_col = DELTA_TABLES.get(table_name)
+	if part_col:
+		particiones = list({str(f[part_col]) for f in (filas or []) + (borradas or []) if part_col in f})
+	if table_name in RLS_OVERLAY_TABLES:
+		invalidar_tablas([table_name], particiones)
+		return
+
+	store = _get_store()
+	try:
+		with store["lock"]:
+			# Primero la versión: las entradas parcheadas quedan con la nueva
+			_subir_version(store, [table_name])
+			for key, entry in list(store["tablas"].items()):
+				# (puede haberla desalojado el parche de otra proyección)
+				if key[1] != table_name or key not in store["tablas"]:
+					continue
+				df = _parchear_df(table_name, entry["df"], key[2], filas, borradas)
+				nueva = {
+					**entry, "df": df, "marca": _marca_de(table_name, df),
+					"pendientes": set(entry["pendientes"]), "indices": {},
+				}
+				nueva.pop("bytes", None)
+				_guardar_entrada(store, key, _medir_entrada(nueva))
+			# Una carga en curso puede haber leído antes de la escritura
+			for key, vuelo in store["vuelos"].items():
+				if key[1] != table_name:
+					continue
+				if part_col:
+					vuelo["pendientes"].update(particiones)
+				else:
+					vuelo["valido"] = False
+			completa = store["tablas"].get((SNAPSHOT_SCOPE, table_name, None))
+	except Exception:
+		invalidar_tablas([table_name], particiones)
+		return
 
-	return partidos, partidos_futuros, boxscores, equipos, jugadores
+	# El snapshot en disco pasa a la versión parcheada (o se descarta)
+	if completa is not None and not completa["pendientes"]:
+		_guardar_snapshot(table_name, completa)
+	else:
+		_descartar_snapshot([table_name])
+
+
+# ==============================================================
+# 💾 SNAPSHOT EN DISCO (ARRANQUE EN CALIENTE)
+# ==============================================================
+
+# Las tablas completas del cache público se guardan en Parquet junto con un
+# sello de versión. Al reiniciar el proceso se sirven desde disco y un hilo
+# en segundo plano las contrasta con Supabase.
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "snapshot")
+SNAPSHOT_SCOPE = PUBLIC_SCOPE
+# _SNAPSHOT_LOCK protege version.json y _SNAPSHOT_TABLAS. Cada tabla tiene
+# además su propio lock, tomado mientras se reemplaza su Parquet y su sello,
+# y la versión más nueva guardada o descartada en este proceso.
+_SNAPSHOT_LOCK = threading.Lock()
+_SNAPSHOT_TABLAS = {}
+
+
+def _ruta_snapshot(table_name: str) -> str:
+	return os.path.join(SNAPSHOT_DIR, f"{table_name}.parquet")
+
+
+def _leer_sellos() -> dict:
+	"""Lee el archivo de sellos de versión del snapshot ({} si no existe)."""
+	try:
+		with open(os.path.join(SNAPSHOT_DIR, "version.json"), encoding="utf-8") as f:
+			return json.load(f)
+	except (OSError, ValueError):
+		return {}
+
+
+def _sello_de(table_name: str, df: pd.DataFrame) -> dict:
+	"""Sello de versión de los datos: cantidad de filas y marca de agua."""
+	return {"filas": int(len(df)), "marca": _marca_de(table_name, df)}
+
+
+def _estado_snapshot(table_name: str) -> dict:
+	"""Lock y última versión guardada o descartada del snapshot de una tabla."""
+	with _SNAPSHOT_LOCK:
+		return _SNAPSHOT_TABLAS.setdefault(table_name, {"lock": threading.Lock(), "version": -1})
+
+
+def _actualizar_sellos(actualizar):
+	"""Aplica actualizar(sellos) a version.json y lo reescribe de forma atómica."""
+	with _SNAPSHOT_LOCK:
+		sellos = _leer_sellos()
+		actualizar(sellos)
+		fd, tmp = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix=".json.tmp")
+		with os.fdopen(fd, "w", encoding="utf-8") as f:
+			json.dump(sellos, f, indent=2)
+		os.replace(tmp, os.path.join(SNAPSHOT_DIR, "version.json"))
+
+
+def _guardar_snapshot(table_name: str, entry: dict):
+	"""
+	Escribe la tabla en Parquet y actualiza su sello de versión.
+	Las escrituras son atómicas (archivo temporal único + os.replace) y el
+	Parquet y el sello se reemplazan juntos bajo el lock de la tabla. Si ya
+	se guardó o descartó una versión más nueva (por ejemplo un refresco de
+	fondo que termina después de una escritura del admin), no se escribe.
+	Si pyarrow no está instalado o el disco falla, el snapshot simplemente
+	no se usa. Con una fuente local (LocalSource) no hace falta: ya se lee
+	de disco.
+	"""
+	if not get_data_source().remota:
+		return
+	version = entry.get("version", 0)
+	estado = _estado_snapshot(table_name)
+	try:
+		os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+		with estado["lock"]:
+			if version < estado["version"]:
+				return
+			fd, tmp = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix=".parquet.tmp")
+			os.close(fd)
+			try:
+				entry["df"].to_parquet(tmp, index=False)
+				os.replace(tmp, _ruta_snapshot(table_name))
+			finally:
+				if os.path.exists(tmp):
+					os.remove(tmp)
+			estado["version"] = version
+			sello = {
+				**_sello_de(table_name, entry["df"]),
+				"guardado": datetime.now().isoformat(timespec="seconds"),
+			}
+			_actualizar_sellos(lambda sellos: sellos.__setitem__(table_name, sello))
+	except Exception:
+		pass
+
+
+def _descartar_snapshot(tablas: list = None):
+	"""
+	Quita el sello de las tablas indicadas (None = todas) para que su
+	snapshot no se use. Llamar después de subir la versión: las escrituras
+	de snapshot con versiones anteriores que lleguen tarde se ignoran.
+	"""
+	try:
+		nombres = list(tablas) if tablas is not None else sorted(set(TABLAS) | set(_leer_sellos()))
+		for table_name in nombres:
+			estado = _estado_snapshot(table_name)
+			with estado["lock"]:
+				estado["version"] = max(estado["version"], version_tabla(table_name))
+		if not _leer_sellos():
+			return
+
+		def quitar(sellos):
+			for table_name in nombres:
+				sellos.pop(table_name, None)
+
+		_actualizar_sellos(quitar)
+	except Exception:
+		pass
+
+
+def _cargar_snapshot(table_name: str, columns: tuple = None):
+	"""
+	Carga una tabla (o solo algunas columnas) desde el snapshot en disco.
+	
+	Returns:
+		dict: Entrada de cache, o None si no hay snapshot utilizable
+	"""
+	if not get_data_source().remota:
+		return None
+	sello = _leer_sellos().get(table_name)
+	if not sello or not os.path.exists(_ruta_snapshot(table_name)):
+		return None
+	try:
+		read_cols = None
+		if columns is not None:
+			read_cols = [c for c in TABLE_KEYS.get(table_name, []) if c not in columns] + list(columns)
+		df = pd.read_parquet(_ruta_snapshot(table_name), columns=read_cols)
+	except Exception:
+		return None
+	return {
+		"df": _aplicar_schema(table_name, df), "marca": sello.get("marca"),
+		"pendientes": set(), "cargado": time.monotonic(),
+	}
+
+
+def _sello_servidor(client: Client, table_name: str) -> dict:
+	"""Sello de versión de la tabla en Supabase, sin descargar las filas."""
+	sello = {"filas": _contar_filas(client, table_name), "marca": None}
+	part_col = DELTA_TABLES.get(table_name)
+	if part_col:
+		data = (
+			client.table(table_name)
+			.select(part_col)
+			.order(part_col, desc=True)
+			.limit(1)
+			.execute()
+			.data
+		)
+		if data:
+			sello["marca"] = str(data[0][part_col])
+	return sello
+
+
+def _validar_snapshot():
+	"""
+	Contrasta el snapshot con el servidor y recarga lo que haya cambiado.
+	- Tablas de DELTA_TABLES: se recargan solo si cambió su sello (filas, marca)
+	- Resto de tablas (chicas): se recargan siempre, porque sus ediciones
+	  (ej: cambio de equipo de un jugador) no cambian la cantidad de filas
+	Corre en un hilo sin sesión de Streamlit, por eso usa el cliente anónimo.
+	"""
+	store = _get_store()
+	sellos = _leer_sellos()
+	for table_name in TABLAS:
+		version = version_tabla(table_name)
+		try:
+			if table_name in DELTA_TABLES:
+				sello = get_data_source().sello(table_name, get_supabase_anon())
+				local = sellos.get(table_name, {})
+				if sello == {"filas": local.get("filas"), "marca": local.get("marca")}:
+					continue
+			entry = _nueva_entrada(table_name, client=get_supabase_anon())
+		except Exception:
+			continue
+
+		_medir_entrada(entry)
+		with store["lock"]:
+			# Una escritura durante la recarga: lo cacheado ya es más nuevo
+			if store["versiones"].get(table_name, 0) != version:
+				continue
+			_subir_version(store, [table_name])
+			_guardar_entrada(store, (SNAPSHOT_SCOPE, table_name, None), entry)
+			# Las proyecciones cargadas del snapshot viejo se vuelven a leer
+			for key in list(store["tablas"]):
+				if key[0] == SNAPSHOT_SCOPE and key[1] == table_name and key[2] is not None:
+					del store["tablas"][key]
+		_guardar_snapshot(table_name, entry)
+
+
+def _iniciar_validacion_snapshot():
+	"""Lanza la validación del snapshot una sola vez por proceso."""
+	store = _get_store()
+	with store["lock"]:
+		if store.get("snapshot_validado"):
+			return
+		store["snapshot_validado"] = True
+	threading.Thread(target=_validar_snapshot, name="validar-snapshot", daemon=True).start()
+
+
+def _revalidar_entrada(entry: dict, table_name: str, columns: tuple = None, client: Client = None) -> dict:
+	"""
+	Refresco de una entrada vencida (CACHE_TTL).
+	- Tablas de DELTA_TABLES: si el sello del servidor (filas, marca) no
+	  cambió no se descarga nada; si cambió se sincroniza solo lo nuevo, y
+	  si aun así no cuadran las filas se recarga completa
+	- Resto de tablas (chicas): se recargan completas
+	"""
+	if table_name not in DELTA_TABLES:
+		return _nueva_entrada(table_name, columns, client)
+	sello = get_data_source().sello(table_name, client)
+	if sello == {"filas": len(entry["df"]), "marca": entry["marca"]}:
+		return {**entry, "cargado": time.monotonic()}
+	nueva = _sincronizar_entrada(entry, table_name, columns, client)
+	if len(nueva["df"]) != sello["filas"]:
+		nueva = _nueva_entrada(table_name, columns, client)
+	return nueva
+
+
+def _vencida(entry: dict) -> bool:
+	"""True si la entrada superó CACHE_TTL desde su última carga."""
+	return CACHE_TTL is not None and time.monotonic() - entry.get("cargado", 0) > CACHE_TTL
+
+
+def _volar(key: tuple, vuelo: dict, cargar) -> tuple:
+	"""
+	Ejecuta la carga de un vuelo, guarda el resultado en el cache y se lo
+	entrega a las sesiones que lo estaban esperando.
+	
+	Returns:
+		tuple: (entrada, guardada). guardada es False si el vuelo se
+			invalidó durante la carga: la entrada sirve para responder,
+			pero no debe llegar al cache ni al snapshot en disco
+	"""
+	store = _get_store()
+	try:
+		entry = _medir_entrada(cargar())
+		with store["lock"]:
+			entry["pendientes"] |= vuelo["pendientes"]
+			# clear_cache() o invalidar_tablas() durante la carga: el resultado puede ser viejo
+			guardada = vuelo["valido"]
+			if guardada:
+				_guardar_entrada(store, key, entry)
+			del store["vuelos"][key]
+		vuelo["future"].set_result(entry)
+	except BaseException as e:
+		with store["lock"]:
+			store["vuelos"].pop(key, None)
+		if isinstance(e, Exception) and not vuelo.get("fondo"):
+			vuelo["future"].set_exception(e)
+		else:
+			# Rerun/stop de Streamlit o refresco de fondo fallido:
+			# quien esperaba vuelve a intentar por su cuenta
+			vuelo["future"].set_result(None)
+		raise
+	return entry, guardada
+
+
+def _revalidar_en_fondo(key: tuple, vuelo: dict, entry: dict, client: Client):
+	"""Hilo de stale-while-revalidate: refresca la entrada y la reemplaza."""
+	_, table_name, columns = key
+	try:
+		nueva, guardada = _volar(key, vuelo, lambda: _revalidar_entrada(entry, table_name, columns, client))
+	except Exception:
+		# Sin conexión: se sigue sirviendo lo cacheado y se reintenta en un TTL
+		entry["cargado"] = time.monotonic()
+		return
+	if not guardada:
+		# Una escritura invalidó la tabla durante el refresco (ya subió la versión)
+		return
+	if nueva["df"] is not entry["df"] and not nueva["df"].equals(entry["df"]):
+		# Cambios hechos en el servidor por fuera de esta app
+		store = _get_store()
+		with store["lock"]:
+			_subir_version(store, [table_name])
+			nueva["version"] = store["versiones"][table_name]
+	if key[0] == SNAPSHOT_SCOPE and columns is None and not nueva["pendientes"]:
+		_guardar_snapshot(table_name, nueva)
+
+
+def _respaldo(table_name: str, entry: dict, error: ErrorDescarga) -> dict:
+	"""
+	Qué devolver cuando una carga falló incluso con reintentos: los datos
+	anteriores si los hay (siguen marcados como pendientes y se reintentan
+	en la próxima lectura) o una tabla vacía que no se guarda en el cache.
+	"""
+	if entry is not None:
+		st.warning(f"⚠️ No se pudo actualizar {table_name}, se muestran los datos anteriores. ({error})")
+		return entry
+	st.warning(f"⚠️ {error}")
+	return {"df": pd.DataFrame(), "marca": None, "pendientes": set(), "cargado": time.monotonic(), "bytes": 0, "respaldo": True}
+
+
+def _obtener_entrada(table_name: str, columns: list = None, cache_key: str = None, client: Client = None, respaldo: bool = True) -> dict:
+	"""
+	Devuelve la entrada del cache de una tabla, cargándola o sincronizándola
+	si hace falta. Desde otro hilo (sin sesión de Streamlit) hay que pasar
+	cache_key y client, y respaldo=False: el ErrorDescarga se lanza en vez
+	de mostrar el aviso de _respaldo.
+	Single-flight: si varias sesiones piden la misma entrada a la vez (por
+	ejemplo todas las que se recargan después de una escritura del admin),
+	solo una descarga y las demás esperan su resultado. Si mientras tanto
+	hubo otra escritura, al terminar se hace una única sincronización más.
+	Una entrada vencida (CACHE_TTL) se devuelve igual, sin esperar, y se
+	refresca en segundo plano.
+	"""
+	cache_key = cache_key or get_cache_key(table_name)
+	client = client or _cliente_para(cache_key)
+	columns = tuple(columns) if columns is not None else None
+	key = (cache_key, table_name, columns)
+	store = _get_store()
+
+	while True:
+		with store["lock"]:
+			entry = store["tablas"].get(key)
+			vuelo = store["vuelos"].get(key)
+			if entry is not None and not entry["pendientes"]:
+				store["tablas"].move_to_end(key)
+				if vuelo is None and _vencida(entry):
+					vuelo = {"future": Future(), "pendientes": set(), "valido": True, "fondo": True}
+					store["vuelos"][key] = vuelo
+					threading.Thread(
+						target=_revalidar_en_fondo, args=(key, vuelo, entry, client),
+						name=f"revalidar-{table_name}", daemon=True,
+					).start()
+				return entry
+			if vuelo is None:
+				vuelo = {"future": Future(), "pendientes": set(), "valido": True}
+				store["vuelos"][key] = vuelo
+				break
+		# Otra sesión ya está cargando esta entrada: esperar y volver a mirar.
+		# Si su carga falló, acá se responde igual que en esa sesión.
+		try:
+			vuelo["future"].result()
+		except ErrorDescarga as e:
+			if not respaldo:
+				raise
+			return _respaldo(table_name, entry, e)
+
+	resultado = {}
+
+	def cargar():
+		if entry is None and cache_key == SNAPSHOT_SCOPE:
+			snapshot = _cargar_snapshot(table_name, columns)
+			if snapshot is not None:
+				resultado["snapshot"] = True
+				return snapshot
+		if entry is None:
+			return _nueva_entrada(table_name, columns, client)
+		return _sincronizar_entrada(entry, table_name, columns, client)
+
+	try:
+		nueva, guardada = _volar(key, vuelo, cargar)
+	except ErrorDescarga as e:
+		if not respaldo:
+			raise
+		return _respaldo(table_name, entry, e)
+	if resultado.get("snapshot"):
+		_iniciar_validacion_snapshot()
+	elif guardada and cache_key == SNAPSHOT_SCOPE and columns is None and not nueva["pendientes"]:
+		_guardar_snapshot(table_name, nueva)
+	return nueva
+
+
+def load_table(table_name: str, columns: list = None) -> pd.DataFrame:
+	"""
+	Carga una sola tabla, opcionalmente solo con las columnas indicadas.
+	Las páginas livianas deberían pedir solo lo que usan, por ejemplo:
+		load_table("boxscores", ["PLAYER_NAME", "TEAM_ABBREVIATION", "PTS"])
+	
+	Args:
+		table_name: Nombre de la tabla
+		columns: Columnas necesarias (None = todas). La clave primaria
+			de la tabla se incluye siempre.
+	
+	Returns:
+		pd.DataFrame: Datos de la tabla
+	"""
+	return _entregar(_obtener_entrada(table_name, columns))
+
+
+def _indice(entry: dict, columna: str) -> dict:
+	"""
+	Índice {clave: posiciones de fila} de una columna de la entrada.
+	Se arma una sola vez por versión de la tabla: cada sincronización crea
+	una entrada nueva, sin índices.
+	"""
+	indices = entry.setdefault("indices", {})
+	if columna not in indices:
+		df = entry["df"]
+		indice = df.groupby(columna, sort=False, observed=True).indices if columna in df.columns else {}
+		# El índice cuenta en CACHE_MAX_BYTES como parte de la entrada
+		store = _get_store()
+		with store["lock"]:
+			if columna not in indices:
+				indices[columna] = indice
+				entry["bytes"] = entry.get("bytes", 0) + _medir_valor(indice)
+				_liberar_memoria(store)
+	return indices[columna]
+
+
+def buscar_filas(table_name: str, columna: str, valor) -> pd.DataFrame:
+	"""
+	Filas de una tabla cacheada cuya clave canónica coincide con valor,
+	usando un índice hash en lugar de recorrer y convertir toda la columna.
+	
+	Args:
+		table_name: Nombre de la tabla
+		columna: Columna clave (ver CLAVES), por ejemplo "GAME_KEY"
+		valor: Valor buscado, en cualquier formato (se normaliza)
+	
+	Returns:
+		pd.DataFrame: Filas encontradas (vacío si no hay)
+	"""
+	entry = _obtener_entrada(table_name)
+	clave = CLAVES.get(columna, lambda v: v)(valor)
+	posiciones = _indice(entry, columna).get(clave, [])
+	return _entregar(entry).iloc[posiciones]
+
+
+def buscar_partido(game_id) -> pd.DataFrame:
+	"""Fila del partido jugado con ese GAME_ID (vacío si no existe)."""
+	return buscar_filas("partidos", "GAME_KEY", game_id)
+
+
+def buscar_boxscores_partido(game_id) -> pd.DataFrame:
+	"""Boxscores de todos los jugadores de un partido."""
+	return buscar_filas("boxscores", "GAME_KEY", game_id)
+
+
+def buscar_jugador(player_id) -> pd.DataFrame:
+	"""Fila del jugador con ese PLAYER_ID (vacío si no existe)."""
+	return buscar_filas("jugadores", "PLAYER_ID", player_id)
+
+
+def buscar_equipo(team_abbr) -> pd.DataFrame:
+	"""Fila del equipo con esa abreviatura (vacío si no existe)."""
+	return buscar_filas("equipos", "TEAM_ABBREVIATION", team_abbr)
 
 
 def load_data():
 	"""
-	Carga los datos desde Supabase con cache inteligente.
-	- Cache separado para usuarios anónimos y autenticados
+	Carga los datos desde la fuente configurada (Supabase o archivos locales,
+	ver get_data_source) con cache inteligente.
+	- Una sola copia compartida de las tablas públicas para todos los usuarios
+	- Copias por rol solo para las tablas de RLS_OVERLAY_TABLES
 	- Cache persistente hasta que se limpie manualmente o se reinicie la app
-	- Se invalida automáticamente cuando cambia el estado de autenticación
+	
+	- Las tablas se descargan a la vez (ver _cargar_tablas)
+	
+	Returns:
+		tuple: (partidos, partidos_futuros, boxscores, equipos, jugadores)
+	"""
+	tablas = _cargar_tablas(TABLAS)
+	return tuple(tablas[table_name] for table_name in TABLAS)
+
+
+def _cargar_tablas(nombres) -> dict:
+	"""
+	Carga varias tablas completas a la vez, una por hilo: en frío la espera
+	es la de la tabla más lenta y no la suma de todas. El ámbito y el cliente
+	se resuelven acá, con la sesión; los avisos de _respaldo también se
+	muestran acá, en orden.
+	"""
+	ambitos = {table_name: get_cache_key(table_name) for table_name in nombres}
+	clientes = {cache_key: _cliente_para(cache_key) for cache_key in set(ambitos.values())}
+	with ThreadPoolExecutor(max_workers=max(1, len(ambitos))) as executor:
+		futures = {
+			table_name: executor.submit(
+				_obtener_entrada, table_name, None, cache_key, clientes[cache_key], False
+			)
+			for table_name, cache_key in ambitos.items()
+		}
+
+	store = _get_store()
+	tablas = {}
+	for table_name, future in futures.items():
+		try:
+			entry = future.result()
+		except ErrorDescarga as e:
+			with store["lock"]:
+				anterior = store["tablas"].get((ambitos[table_name], table_name, None))
+			entry = _respaldo(table_name, anterior, e)
+		tablas[table_name] = _entregar(entry)
+	return tablas
+
+
+class Dataset:
+	"""
+	Acceso perezoso a las tablas: cada una se carga (con load_table) recién
+	la primera vez que se usa, así una página no espera por tablas que no
+	necesita. Ejemplo:
+		datos = get_dataset()
+		partidos, equipos = datos.partidos, datos.equipos  # no descarga boxscores
+	También se puede desempaquetar como load_data(), pero eso carga todo.
+	"""
+
+	def __init__(self):
+		self._tablas = {}
+
+	def __getattr__(self, table_name: str) -> pd.DataFrame:
+		if table_name not in TABLAS:
+			raise AttributeError(table_name)
+		return self[table_name]
+
+	def __getitem__(self, table_name: str) -> pd.DataFrame:
+		if table_name not in self._tablas:
+			self._tablas[table_name] = load_table(table_name)
+		return self._tablas[table_name]
+
+	def __iter__(self):
+		# Desempaquetar usa todas las tablas: las que faltan se cargan a la vez
+		faltan = [table_name for table_name in TABLAS if table_name not in self._tablas]
+		if len(faltan) > 1:
+			self._tablas.update(_cargar_tablas(faltan))
+		return (self[table_name] for table_name in TABLAS)
+
+	def cargadas(self) -> list:
+		"""Tablas que ya se cargaron en este Dataset."""
+		return list(self._tablas)
+
+
+def get_dataset() -> Dataset:
+	"""
+	Devuelve un Dataset perezoso con las tablas de TABLAS.
+	Preferirlo a load_data() en las páginas que no usan todas las tablas.
 	"""
-	cache_key = get_cache_key()
-	return _load_data_cached(cache_key)
+	return Dataset()
+
+
+# ==============================================================
+# 🦆 CONSULTAS SQL (DUCKDB)
+# ==============================================================
+
+# Cantidad máxima de resultados de query() guardados (LRU); además cuentan
+# en el presupuesto de memoria CACHE_MAX_BYTES
+QUERY_CACHE_MAX = 64
+
+_PATRON_TABLAS = re.compile(r"\b(" + "|".join(TABLAS) + r")\b")
+
+
+def query(sql: str, params=None) -> pd.DataFrame:
+	"""
+	Ejecuta una consulta SQL con DuckDB sobre las tablas cacheadas, que se
+	usan con su nombre de TABLAS (DuckDB las lee directo de los DataFrames,
+	sin copiarlas). El resultado se guarda por versión de los datos (ver
+	versiones): mientras no cambie ninguna tabla de la consulta, repetirla
+	con los mismos parámetros no vuelve a ejecutarla. Ejemplo:
+		query(
+			"SELECT TEAM_ABBREVIATION, AVG(PTS) AS PTS FROM boxscores "
+			"WHERE GAME_ID >= ? GROUP BY TEAM_ABBREVIATION",
+			["0022300500"],
+		)
+	
+	Args:
+		sql: Consulta SQL
+		params: Parámetros (lista para ?, dict para $nombre) o None
+	
+	Returns:
+		pd.DataFrame: Resultado de la consulta (de solo lectura, como load_table)
+	
+	Raises:
+		ImportError: si duckdb no está instalado
+	"""
+	try:
+		import duckdb
+	except ImportError as e:
+		raise ImportError("query() necesita duckdb: pip install duckdb") from e
+	tablas = sorted(set(_PATRON_TABLAS.findall(sql)))
+	# La versión se toma antes de leer: si hay una escritura en el medio,
+	# el resultado queda guardado con la versión vieja y no se reutiliza
+	version = versiones(tablas)
+	entries = {t: _obtener_entrada(t) for t in tablas}
+	key = (sql, json.dumps(params, sort_keys=True, default=str))
+	store = _get_store()
+	with store["lock"]:
+		guardada = store["consultas"].get(key)
+		if guardada is not None and guardada["version"] == version:
+			store["consultas"].move_to_end(key)
+			return _entregar(guardada)
+
+	frames = {t: entry["df"] for t, entry in entries.items()}
+	con = duckdb.connect()
+	try:
+		for table_name, df in frames.items():
+			con.register(table_name, df)
+		resultado = {"df": con.execute(sql, params).df(), "version": version, "cargado": time.monotonic()}
+	finally:
+		con.close()
+	# Datos anteriores o vacíos por un error de descarga: no se guarda
+	if any(entry["pendientes"] or entry.get("respaldo") for entry in entries.values()):
+		return _entregar(resultado)
+
+	# Cuenta en CACHE_MAX_BYTES junto con las tablas (ver _liberar_memoria)
+	_medir_entrada(resultado)
+	with store["lock"]:
+		consultas = store["consultas"]
+		consultas[key] = resultado
+		consultas.move_to_end(key)
+		while len(consultas) > QUERY_CACHE_MAX:
+			consultas.popitem(last=False)
+		_liberar_memoria(store, key)
+	return _entregar(resultado)
+
+
+# ==============================================================
+# 🏀 TABLA EQUIPO-PARTIDO
+# ==============================================================
+
+# Estadísticas de boxscores que get_team_game suma por equipo y partido
+STATS_EQUIPO = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
+
+_COLUMNAS_PARTIDOS = {"GAME_ID", "GAME_KEY", "FECHA", "LOCAL", "VISITANTE", "PTS_LOCAL", "PTS_VISITANTE"}
+
+
+def _lados_partidos(partidos: pd.DataFrame) -> pd.DataFrame:
+	"""Dos filas por partido jugado (local y visitante) con el rival y el resultado."""
+	columnas = ["GAME_ID", "GAME_KEY", "FECHA", "TEAM_ABBREVIATION", "OPP", "HOME", "PTS_FOR", "PTS_AGAINST"]
+	if not _COLUMNAS_PARTIDOS.issubset(partidos.columns):
+		return pd.DataFrame(columns=columnas)
+	lados = [
+		pd.DataFrame({
+			"GAME_ID": partidos["GAME_ID"],
+			"GAME_KEY": partidos["GAME_KEY"],
+			"FECHA": partidos["FECHA"],
+			"TEAM_ABBREVIATION": partidos[equipo].astype(str),
+			"OPP": partidos[rival].astype(str),
+			"HOME": home,
+			"PTS_FOR": partidos[pts_for],
+			"PTS_AGAINST": partidos[pts_against],
+		})
+		for equipo, rival, pts_for, pts_against, home in (
+			("LOCAL", "VISITANTE", "PTS_LOCAL", "PTS_VISITANTE", True),
+			("VISITANTE", "LOCAL", "PTS_VISITANTE", "PTS_LOCAL", False),
+		)
+	]
+	return pd.concat(lados, ignore_index=True)
+
+
+def armar_team_game(partidos: pd.DataFrame, boxscores: pd.DataFrame = None) -> pd.DataFrame:
+	"""
+	Arma la tabla de get_team_game a partir de los DataFrames recibidos (para
+	usar dentro de calculo_derivado). Sin boxscores solo tiene los resultados.
+	Los partidos que están en boxscores pero no en partidos quedan sin
+	rival ni resultado (OPP nulo, WIN y LOSS en 0).
+	"""
+	tg = _lados_partidos(partidos)
+	if boxscores is not None and {"GAME_KEY", "TEAM_ABBREVIATION"}.issubset(boxscores.columns):
+		stats = [c for c in STATS_EQUIPO if c in boxscores.columns]
+		propias = (
+			boxscores.groupby(["GAME_KEY", "TEAM_ABBREVIATION"], observed=True)
+			.agg({"GAME_ID": "first", **{c: "sum" for c in stats}})
+			.reset_index()
+		)
+		propias["TEAM_ABBREVIATION"] = propias["TEAM_ABBREVIATION"].astype(str)
+		tg = tg.merge(propias, on=["GAME_KEY", "TEAM_ABBREVIATION"], how="outer", sort=False, suffixes=("", "_BOX"))
+		tg["GAME_ID"] = tg["GAME_ID"].fillna(tg.pop("GAME_ID_BOX"))
+		# Estadísticas del rival en el mismo partido (solo partidos de partidos)
+		rivales = propias.drop(columns="GAME_ID").rename(
+			columns={"TEAM_ABBREVIATION": "OPP", **{c: f"OPP_{c}" for c in stats}}
+		)
+		tg = tg.merge(rivales, on=["GAME_KEY", "OPP"], how="left", sort=False)
+
+	tg["WIN"] = (tg["PTS_FOR"] > tg["PTS_AGAINST"]).astype("int8")
+	tg["LOSS"] = (tg["PTS_FOR"] < tg["PTS_AGAINST"]).astype("int8")
+	for col in ("TEAM_ABBREVIATION", "OPP"):
+		tg[col] = tg[col].astype("category")
+	primeras = ["GAME_ID", "GAME_KEY", "FECHA", "TEAM_ABBREVIATION", "OPP", "HOME", "PTS_FOR", "PTS_AGAINST", "WIN", "LOSS"]
+	tg = tg[primeras + [c for c in tg.columns if c not in primeras]]
+	return tg.sort_values("FECHA", kind="stable", ignore_index=True)
+
+
+def get_team_game(estadisticas: bool = True) -> pd.DataFrame:
+	"""
+	Tabla equipo-partido: una fila por (GAME_ID, equipo), ordenada por fecha.
+	Se arma una sola vez por versión de partidos y boxscores y la comparten
+	todas las páginas y sesiones (en lugar de reagrupar boxscores en cada
+	rerun). Columnas:
+	- GAME_ID, GAME_KEY, FECHA, TEAM_ABBREVIATION
+	- OPP (rival), HOME (si jugó de local)
+	- PTS_FOR, PTS_AGAINST, WIN, LOSS: resultado según partidos
+	- STATS_EQUIPO: suma de los boxscores del equipo en el partido
+	  (nulas si el equipo no tiene boxscores de ese partido)
+	- OPP_<stat>: las mismas sumas del rival
+
+	Args:
+		estadisticas: False para solo el resultado, sin cargar boxscores
+			(alcanza para las tablas de posiciones)
+
+	Returns:
+		pd.DataFrame: Tabla equipo-partido (de solo lectura, como load_table)
+	"""
+	if estadisticas:
+		return calculo_derivado("team_game", ("partidos", "boxscores"), armar_team_game)
+	return calculo_derivado("team_game_resultados", ("partidos",), armar_team_game)
 
 
 def clear_cache():
 	"""
-	Invalida el cache de datos. Útil después de operaciones CRUD
-	para asegurar que los datos mostrados estén actualizados.
+	Invalida el cache de datos completo (memoria y snapshot en disco) y sube
+	la versión de todas las tablas. Las escrituras del admin no lo usan:
+	aplican sus filas al cache con _parchear_tabla() o invalidan solo las
+	tablas que tocaron con invalidar_tablas().
 	"""
-	_load_data_cached.clear()
+	store = _get_store()
+	with store["lock"]:
+		store["tablas"].clear()
+		store["consultas"].clear()
+		store["derivadas"].clear()
+		for vuelo in store["vuelos"].values():
+			vuelo["valido"] = False
+		_subir_version(store, set(TABLAS) | set(store["versiones"]))
+	_descartar_snapshot()
 
 
 # ==============================================================
@@ -185,6 +2038,8 @@ def init_session_state():
 		st.session_state.access_token = None
 	if "refresh_token" not in st.session_state:
 		st.session_state.refresh_token = None
+	if "token_expira" not in st.session_state:
+		st.session_state.token_expira = None
 
 
 def check_auth():
@@ -201,6 +2056,13 @@ def check_auth():
 	return False
 
 
+def _guardar_tokens(session):
+	"""Guarda en la sesión de Streamlit los tokens de una sesión de Supabase."""
+	st.session_state.access_token = session.access_token
+	st.session_state.refresh_token = session.refresh_token
+	st.session_state.token_expira = session.expires_at
+
+
 def login(email: str, password: str) -> tuple[bool, str]:
 	"""
 	Inicia sesión con email y contraseña
@@ -209,21 +2071,19 @@ def login(email: str, password: str) -> tuple[bool, str]:
 		tuple: (success: bool, message: str)
 	"""
 	try:
-		# Crear un cliente temporal para el login
-		temp_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+		# Cliente temporal para el login (usa el pool de conexiones compartido)
+		temp_client = _nuevo_cliente()
 		response = temp_client.auth.sign_in_with_password({
 			"email": email,
 			"password": password
 		})
 		
 		if response.user and response.session:
-			# Guardar el cliente autenticado en session_state
-			# Este cliente ya tiene la sesión configurada automáticamente
-			st.session_state.supabase_client_auth = temp_client
+			# Solo se guardan los tokens: get_supabase_client() arma las
+			# consultas autenticadas con ellos sobre el cliente compartido
 			st.session_state.authenticated = True
 			st.session_state.user = response.user
-			st.session_state.access_token = response.session.access_token
-			st.session_state.refresh_token = response.session.refresh_token
+			_guardar_tokens(response.session)
 			return True, "Inicio de sesión exitoso"
 		else:
 			return False, "Error al iniciar sesión"
@@ -239,9 +2099,9 @@ def login(email: str, password: str) -> tuple[bool, str]:
 def logout():
 	"""Cierra la sesión del usuario"""
 	try:
-		# Intentar cerrar sesión con el cliente autenticado si existe
-		if "supabase_client_auth" in st.session_state and st.session_state.supabase_client_auth:
-			st.session_state.supabase_client_auth.auth.sign_out()
+		# Revocar la sesión en Supabase con el token del usuario
+		if st.session_state.get("access_token"):
+			get_supabase_anon().auth.admin.sign_out(st.session_state.access_token, "local")
 	except Exception:
 		pass
 	
@@ -250,8 +2110,7 @@ def logout():
 	st.session_state.user = None
 	st.session_state.access_token = None
 	st.session_state.refresh_token = None
-	if "supabase_client_auth" in st.session_state:
-		del st.session_state.supabase_client_auth
+	st.session_state.token_expira = None
 
 
 def get_current_user():
@@ -284,7 +2143,7 @@ def insert_jugador(jugador_data: dict) -> tuple[bool, str]:
 		response = client.table("jugadores").insert(jugador_data).execute()
 		
 		if response.data:
-			clear_cache()  # Invalidar cache después de modificar datos
+			_parchear_tabla("jugadores", filas=response.data)  # Agregar al cache sin recargar
 			return True, f"✅ Jugador agregado exitosamente (ID: {response.data[0].get('PLAYER_ID', 'N/A')})"
 		else:
 			return False, "❌ Error: No se pudo insertar el jugador"
@@ -321,7 +2180,7 @@ def update_jugador_team(player_id: str, team_abbreviation: str) -> tuple[bool, s
 		)
 		
 		if response.data:
-			clear_cache()  # Invalidar cache después de modificar datos
+			_parchear_tabla("jugadores", filas=response.data)  # Actualizar el cache sin recargar
 			return True, f"✅ Equipo actualizado exitosamente para el jugador {player_id}"
 		else:
 			return False, f"❌ No se encontró un jugador con PLAYER_ID: {player_id}"
@@ -355,7 +2214,7 @@ def delete_jugador(player_id: str) -> tuple[bool, str]:
 		)
 		
 		if response.data:
-			clear_cache()  # Invalidar cache después de modificar datos
+			_parchear_tabla("jugadores", borradas=response.data)  # Quitar del cache sin recargar
 			return True, f"✅ Jugador eliminado exitosamente (ID: {player_id})"
 		else:
 			return False, f"❌ No se encontró un jugador con PLAYER_ID: {player_id}"
@@ -463,7 +2322,8 @@ def insert_boxscores(boxscores_data: list) -> tuple[bool, str]:
 		response = client.table("boxscores").insert(boxscores_data).execute()
 		
 		if response.data:
-			clear_cache()  # Invalidar cache después de modificar datos
+			# Agregar las filas insertadas al cache sin recargar
+			_parchear_tabla("boxscores", filas=response.data)
 			return True, f"✅ {len(response.data)} boxscore(s) insertado(s) exitosamente"
 		else:
 			return False, "❌ Error: No se pudieron insertar los boxscores"
@@ -514,6 +2374,7 @@ def crear_partido_jugado(game_id: str, pts_local: int, pts_visitante: int) -> tu
 				.execute()
 			)
 			if response_update.data:
+				_parchear_tabla("partidos", filas=response_update.data)
 				return True, f"✅ Partido {game_id} actualizado exitosamente"
 			else:
 				return False, "❌ Error al actualizar el partido"
@@ -534,6 +2395,7 @@ def crear_partido_jugado(game_id: str, pts_local: int, pts_visitante: int) -> tu
 		if not response_insert.data:
 			return False, "❌ Error al insertar el partido en la tabla partidos"
 		
+		_parchear_tabla("partidos", filas=response_insert.data)
 		return True, f"✅ Partido {game_id} creado exitosamente en partidos"
 			
 	except Exception as e:
@@ -584,6 +2446,7 @@ def mover_partido_futuro_a_jugado(game_id: str, pts_local: int, pts_visitante: i
 			
 			if not response_insert.data:
 				return False, "❌ Error al insertar el partido en la tabla partidos"
+			_parchear_tabla("partidos", filas=response_insert.data)
 		
 		# Eliminar de partidos_futuros
 		response_delete = (
@@ -593,7 +2456,8 @@ def mover_partido_futuro_a_jugado(game_id: str, pts_local: int, pts_visitante: i
 			.execute()
 		)
 		
-		clear_cache()  # Invalidar cache después de modificar datos
+		# Quitar el partido de futuros en el cache sin recargar
+		_parchear_tabla("partidos_futuros", borradas=response_delete.data)
 		return True, f"✅ Partido {game_id} movido exitosamente de futuros a jugados"
 			
 	except Exception as e:
@@ -729,7 +2593,10 @@ def eliminar_partido(game_id: str) -> tuple[bool, str]:
 			.execute()
 		)
 		
-		clear_cache()  # Invalidar cache después de modificar datos
+		# Aplicar las tres escrituras al cache sin recargar
+		_parchear_tabla("boxscores", borradas=response_delete_boxscores.data)
+		_parchear_tabla("partidos_futuros", filas=response_insert.data)
+		_parchear_tabla("partidos", borradas=response_delete.data)
 		return True, f"✅ Partido {game_id} eliminado exitosamente. Boxscores eliminados y partido movido a futuros."
 			
 	except Exception as e: